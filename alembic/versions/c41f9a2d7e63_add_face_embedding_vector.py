@@ -0,0 +1,38 @@
+"""add_face_embedding_vector
+
+Revision ID: c41f9a2d7e63
+Revises: 5708e329289b
+Create Date: 2026-10-15 10:12:41.318204
+
+"""
+
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c41f9a2d7e63"
+down_revision = "5708e329289b"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    # Plaintext copy of the embedding for in-database search. It stays NULL
+    # (and the index empty) unless FACE_VECTOR_SEARCH is on; the column and
+    # index are created regardless so toggling the flag needs no migration.
+    op.add_column("users", sa.Column("face_embedding", Vector(512), nullable=True))
+    op.create_index(
+        "ix_users_face_embedding",
+        "users",
+        ["face_embedding"],
+        postgresql_using="hnsw",
+        postgresql_ops={"face_embedding": "vector_cosine_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_face_embedding", table_name="users")
+    op.drop_column("users", "face_embedding")
@@ -1,16 +1,39 @@
-import base64
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, File, UploadFile
+import pybase64
+from fastapi import FastAPI, File, HTTPException, UploadFile, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.modules.auth.deps import get_face_service
+from app.modules.auth.service import shutdown_password_pool
+
+# Read uploads in 192 KiB pieces (a multiple of 3 keeps base64 chunks aligned)
+_BASE64_CHUNK_SIZE = 3 * 64 * 1024
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Load the face models before serving, so the first face request doesn't
+    # pay for reading the weights and the warmup pass
+    if settings.FACE_PRELOAD_MODEL:
+        await asyncio.to_thread(get_face_service)
+    yield
+    shutdown_password_pool()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     description=settings.DESCRIPTION,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -21,6 +44,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger responses (e.g. /image-to-base64 payloads, user lists)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
@@ -45,11 +71,29 @@ async def image_to_base64(file: UploadFile = File(...)):
     Returns:
         dict: Contains the base64 encoded string and file info
     """
-    contents = await file.read()
-    base64_encoded = base64.b64encode(contents).decode("utf-8")
+    if file.size is not None and file.size > settings.MAX_UPLOAD_SIZE_BYTES:
+        raise _file_too_large()
+
+    # Encode chunk by chunk so the raw upload is never fully held in memory.
+    # The chunk size is a multiple of 3 bytes, so every chunk encodes
+    # without padding and the pieces concatenate into valid base64.
+    chunks = []
+    total = 0
+    while chunk := await file.read(_BASE64_CHUNK_SIZE):
+        total += len(chunk)
+        if total > settings.MAX_UPLOAD_SIZE_BYTES:
+            raise _file_too_large()
+        chunks.append(pybase64.b64encode_as_string(chunk))
 
     return {
         "filename": file.filename,
         "content_type": file.content_type,
-        "base64": base64_encoded,
+        "base64": "".join(chunks),
     }
+
+
+def _file_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+        detail=f"File exceeds maximum size of {settings.MAX_UPLOAD_SIZE_BYTES} bytes",
+    )
@@ -0,0 +1,131 @@
+from functools import lru_cache
+from typing import Annotated
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+
+from app.core.config import settings
+from app.db.database import SessionDep
+from app.modules.auth.service import AuthService
+from app.modules.auth.token_cache import token_cache
+from app.modules.user.cache import user_cache
+from app.modules.user.schemas import User
+from app.modules.user.service import FACE_POOL, UserService
+from app.services.embedding_batcher import get_embedding_batcher
+from app.services.encryption_service import (
+    EncryptionService,
+    get_encryption_service,
+)
+from app.services.face_recognition_service import (
+    FaceRecognitionService,
+    get_face_recognition_service,
+)
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/token")
+
+# Raised on hot paths; built once and re-raised with a fresh traceback
+_CREDENTIALS_EXC = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+_INACTIVE_EXC = HTTPException(status_code=400, detail="Inactive user")
+_NOT_SUPERUSER_EXC = HTTPException(
+    status_code=status.HTTP_403_FORBIDDEN,
+    detail="Not enough permissions. Administrator access required.",
+)
+
+
+# Process-wide service instances: built on first use, then reused
+@lru_cache(maxsize=1)
+def get_auth_service() -> AuthService:
+    return AuthService()
+
+
+@lru_cache(maxsize=1)
+def get_face_service() -> FaceRecognitionService:
+    return get_face_recognition_service(
+        model_name=settings.FACE_MODEL_NAME,
+        providers=settings.face_onnx_providers or None,
+        use_opencl=settings.FACE_USE_OPENCL,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_encryption_service_instance() -> EncryptionService:
+    return get_encryption_service(
+        settings.FACE_ENCRYPTION_KEY, use_aes_gcm=settings.FACE_ENCRYPTION_AES_GCM
+    )
+
+
+def get_user_service(db: SessionDep) -> UserService:
+    """User service for plain user operations (no biometrics)"""
+    return UserService(db)
+
+
+def get_face_user_service(
+    db: SessionDep,
+    face_service: FaceRecognitionService = Depends(get_face_service),
+    encryption_service: EncryptionService = Depends(get_encryption_service_instance),
+) -> UserService:
+    """User service wired with the face recognition and encryption services"""
+    return UserService(
+        db,
+        face_service,
+        encryption_service,
+        embedding_batcher=get_embedding_batcher(
+            face_service,
+            max_batch=settings.FACE_BATCH_MAX_SIZE,
+            max_wait_ms=settings.FACE_BATCH_MAX_WAIT_MS,
+            executor=FACE_POOL,
+        ),
+        vector_search=settings.FACE_VECTOR_SEARCH,
+    )
+
+
+async def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    user_service: UserService = Depends(get_user_service),
+    auth_service: AuthService = Depends(get_auth_service),
+) -> User:
+    """Get current authenticated user"""
+    email = token_cache.get(token)
+    if email is None:
+        payload = auth_service.decode_access_token_payload(token)
+        if payload is None:
+            raise _CREDENTIALS_EXC.with_traceback(None)
+        email = payload["sub"]
+        token_cache.set(token, email, payload["exp"])
+
+    if settings.USER_CACHE_ENABLED:
+        user = user_cache.get(email)
+        if user is not None:
+            return user
+
+    db_user = await user_service.get_by_email(email=email)
+    if db_user is None:
+        raise _CREDENTIALS_EXC.with_traceback(None)
+
+    user = User.model_validate(db_user)
+    if settings.USER_CACHE_ENABLED:
+        user_cache.set(email, user)
+
+    return user
+
+
+async def get_current_active_user(
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> User:
+    """Get current active user"""
+    if not current_user.is_active:
+        raise _INACTIVE_EXC.with_traceback(None)
+    return current_user
+
+
+async def get_current_superuser(
+    current_user: Annotated[User, Depends(get_current_active_user)],
+) -> User:
+    """Get current superuser"""
+    if not current_user.is_superuser:
+        raise _NOT_SUPERUSER_EXC.with_traceback(None)
+    return current_user
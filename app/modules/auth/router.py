@@ -1,13 +1,27 @@
-import base64
-from datetime import timedelta
+import binascii
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.ext.asyncio import AsyncSession
+import pybase64
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Request,
+    UploadFile,
+    status,
+)
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import Row
 
 from app.core.config import settings
-from app.db.database import get_db
+from app.modules.auth.deps import (
+    get_auth_service,
+    get_current_active_user,
+    get_face_user_service,
+    get_user_service,
+)
 from app.modules.auth.schemas import (
     FaceEnrollResponse,
     FaceLoginResponse,
@@ -15,136 +29,163 @@ from app.modules.auth.schemas import (
     Token,
     UserLogin,
 )
-from app.modules.auth.service import AuthService
+from app.modules.auth.service import ACCESS_TOKEN_EXPIRE, AuthService
+from app.modules.auth.throttle import login_throttle
 from app.modules.user.schemas import User
 from app.modules.user.service import UserService
-from app.services.encryption_service import (
-    EncryptionService,
-    get_encryption_service,
-)
 from app.services.face_recognition_service import (
-    FaceRecognitionService,
     LowQualityFaceError,
     MultipleFacesError,
     NoFaceDetectedError,
     SpoofingDetectedError,
-    get_face_recognition_service,
 )
 
 router = APIRouter()
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/token")
 
+# Response models below are built with `model_construct`: their data is
+# produced by this service, so validating it again on construction is waste.
 
-def get_auth_service() -> AuthService:
-    return AuthService()
+# Minimum face match confidence (0-100) required to issue a token on face login
+MIN_CONFIDENCE_THRESHOLD = 80.0
 
+# Raised on hot paths; built once and re-raised with a fresh traceback
+_INCORRECT_LOGIN_EXC = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Incorrect email or password",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+_TOO_MANY_ATTEMPTS_EXC = HTTPException(
+    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+    detail="Too many login attempts. Try again later.",
+    headers={"Retry-After": str(int(settings.LOGIN_THROTTLE_REFILL_SECONDS))},
+)
+_USER_NOT_FOUND_EXC = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="User not found",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+_FACE_NOT_ENROLLED_EXC = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Face biometric not enrolled for this user",
+    headers={"WWW-Authenticate": "Bearer"},
+)
 
-def get_face_service() -> FaceRecognitionService:
-    return get_face_recognition_service()
 
+def _image_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+        detail=f"Image exceeds maximum size of {settings.MAX_UPLOAD_SIZE_BYTES} bytes",
+    )
 
-def get_encryption_service_instance() -> EncryptionService:
-    return get_encryption_service(settings.FACE_ENCRYPTION_KEY)
 
+async def _resolve_face_input(
+    face_image_base64: str | None, face_image_file: UploadFile | None
+) -> bytes:
+    """Validate that exactly one face image input was sent and return its bytes"""
+    if not face_image_base64 and not face_image_file:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Either face_image_base64 or face_image_file must be provided",
+        )
 
-def get_user_service(
-    db: AsyncSession = Depends(get_db),
-    face_service: FaceRecognitionService = Depends(get_face_service),
-    encryption_service: EncryptionService = Depends(get_encryption_service_instance),
-) -> UserService:
-    return UserService(db, face_service, encryption_service)
+    if face_image_base64 and face_image_file:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide only one: face_image_base64 or face_image_file",
+        )
 
+    # Pass raw bytes through; only decode when base64 was provided
+    if face_image_file:
+        if (
+            face_image_file.size is not None
+            and face_image_file.size > settings.MAX_UPLOAD_SIZE_BYTES
+        ):
+            raise _image_too_large()
+        # Read at most one byte past the limit in case the size was unknown
+        contents = await face_image_file.read(settings.MAX_UPLOAD_SIZE_BYTES + 1)
+        if len(contents) > settings.MAX_UPLOAD_SIZE_BYTES:
+            raise _image_too_large()
+        return contents
+
+    # Accept an optional data URL prefix ("data:image/jpeg;base64,...")
+    if "," in face_image_base64:
+        face_image_base64 = face_image_base64.split(",", 1)[1]
+    if len(face_image_base64) * 3 // 4 > settings.MAX_UPLOAD_SIZE_BYTES:
+        raise _image_too_large()
+    try:
+        return pybase64.b64decode(face_image_base64)
+    except binascii.Error as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid base64 image: {str(e)}",
+        )
 
-async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    user_service: UserService = Depends(get_user_service),
-    auth_service: AuthService = Depends(get_auth_service),
-) -> User:
-    """Get current authenticated user"""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
 
-    email = auth_service.decode_access_token(token)
-    if email is None:
-        raise credentials_exception
+async def _authenticate_password(
+    request: Request,
+    email: str,
+    password: str,
+    user_service: UserService,
+    auth_service: AuthService,
+) -> Row:
+    """Check email/password (throttled) and return the user's auth row"""
+    client_host = request.client.host if request.client else ""
+    throttle_key = (client_host, email.lower())
+    if not login_throttle.allow(throttle_key):
+        raise _TOO_MANY_ATTEMPTS_EXC.with_traceback(None)
+
+    user = await user_service.get_auth_user_by_email(email=email)
+    verified, new_hash = False, None
+    if user:
+        verified, new_hash = await auth_service.verify_and_update_password(
+            password, user.hashed_password
+        )
+    else:
+        await auth_service.verify_dummy_password(password)
+    if not verified:
+        raise _INCORRECT_LOGIN_EXC.with_traceback(None)
 
-    user = await user_service.get_by_email(email=email)
-    if user is None:
-        raise credentials_exception
+    login_throttle.reset(throttle_key)
+    if new_hash:
+        await user_service.update_password_hash(user.id, new_hash)
 
     return user
 
 
-async def get_current_active_user(
-    current_user: Annotated[User, Depends(get_current_user)],
-) -> User:
-    """Get current active user"""
-    if not current_user.is_active:
-        raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
-
-
-async def get_current_superuser(
-    current_user: Annotated[User, Depends(get_current_active_user)],
-) -> User:
-    """Get current superuser"""
-    if not current_user.is_superuser:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions. Administrator access required.",
-        )
-    return current_user
-
-
 @router.post("/token", response_model=Token)
 async def login_for_swagger(
+    request: Request,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     user_service: UserService = Depends(get_user_service),
     auth_service: AuthService = Depends(get_auth_service),
 ):
     """OAuth2 compatible token endpoint for Swagger UI authentication"""
-    user = await user_service.get_by_email(email=form_data.username)
-    if not user or not auth_service.verify_password(
-        form_data.password, user.hashed_password
-    ):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    user = await _authenticate_password(
+        request, form_data.username, form_data.password, user_service, auth_service
+    )
 
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = auth_service.create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email}, expires_delta=ACCESS_TOKEN_EXPIRE
     )
-    return {"access_token": access_token, "token_type": "bearer"}
+    return Token.model_construct(access_token=access_token, token_type="bearer")
 
 
 @router.post("/login", response_model=Token)
 async def login(
+    request: Request,
     user_login: UserLogin,
     user_service: UserService = Depends(get_user_service),
     auth_service: AuthService = Depends(get_auth_service),
 ):
     """Login endpoint with JSON body - returns JWT token"""
-    user = await user_service.get_by_email(email=user_login.email)
-    if not user or not auth_service.verify_password(
-        user_login.password, user.hashed_password
-    ):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    user = await _authenticate_password(
+        request, user_login.email, user_login.password, user_service, auth_service
+    )
 
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = auth_service.create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email}, expires_delta=ACCESS_TOKEN_EXPIRE
     )
-    return {"access_token": access_token, "token_type": "bearer"}
+    return Token.model_construct(access_token=access_token, token_type="bearer")
 
 
 @router.get("/me", response_model=User)
@@ -158,7 +199,7 @@ async def read_users_me(
 @router.post("/face/enroll", response_model=FaceEnrollResponse)
 async def enroll_face(
     current_user: Annotated[User, Depends(get_current_active_user)],
-    user_service: UserService = Depends(get_user_service),
+    user_service: UserService = Depends(get_face_user_service),
     face_image_base64: str | None = Form(None),
     face_image_file: UploadFile | None = File(None),
 ):
@@ -173,31 +214,15 @@ async def enroll_face(
 
     Only one method should be provided.
     """
-    # Validate that exactly one method is provided
-    if not face_image_base64 and not face_image_file:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Either face_image_base64 or face_image_file must be provided",
-        )
-
-    if face_image_base64 and face_image_file:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Provide only one: face_image_base64 or face_image_file",
-        )
-
-    # Convert file to base64 if file was provided
-    if face_image_file:
-        contents = await face_image_file.read()
-        face_image_base64 = base64.b64encode(contents).decode("utf-8")
+    face_image_bytes = await _resolve_face_input(face_image_base64, face_image_file)
 
     try:
         result = await user_service.enroll_face(
             user_id=current_user.id,
-            face_image_base64=face_image_base64,
+            face_image_bytes=face_image_bytes,
         )
 
-        return FaceEnrollResponse(
+        return FaceEnrollResponse.model_construct(
             success=result["success"],
             message=result["message"],
             quality_score=result["quality_score"],
@@ -233,7 +258,7 @@ async def enroll_face(
 
 @router.post("/face/login", response_model=FaceLoginResponse)
 async def face_login(
-    user_service: UserService = Depends(get_user_service),
+    user_service: UserService = Depends(get_face_user_service),
     auth_service: AuthService = Depends(get_auth_service),
     email: str = Form(...),
     face_image_base64: str | None = Form(None),
@@ -251,70 +276,45 @@ async def face_login(
 
     Only one method should be provided.
     """
-    # Validate that exactly one method is provided
-    if not face_image_base64 and not face_image_file:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Either face_image_base64 or face_image_file must be provided",
-        )
-
-    if face_image_base64 and face_image_file:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Provide only one: face_image_base64 or face_image_file",
-        )
-
-    # Convert file to base64 if file was provided
-    if face_image_file:
-        contents = await face_image_file.read()
-        face_image_base64 = base64.b64encode(contents).decode("utf-8")
+    face_image_bytes = await _resolve_face_input(face_image_base64, face_image_file)
 
     try:
-        # Get user to verify face enrollment
-        user = await user_service.get_by_email(email=email)
+        # Load the user and their enrollment in one query
+        user = await user_service.get_face_auth_bundle(email=email)
         if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+            raise _USER_NOT_FOUND_EXC.with_traceback(None)
 
-        if not user.face_enrolled:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Face biometric not enrolled for this user",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+        if not user.face_enrolled or not user.face_embedding_encrypted:
+            raise _FACE_NOT_ENROLLED_EXC.with_traceback(None)
 
         # Verify face and get confidence score
-        verification_result = await user_service.verify_face(
+        verification_result = await user_service.verify_face_embedding(
             user_id=user.id,
-            face_image_base64=face_image_base64,
+            encrypted_embedding=user.face_embedding_encrypted,
+            face_image_bytes=face_image_bytes,
         )
 
         confidence_percent = verification_result["confidence"]
-        min_confidence_threshold = 80.0
 
         # Check if verified and meets minimum confidence
         if not verification_result["verified"]:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Face authentication failed. Confidence: {confidence_percent:.1f}%. Minimum required: {min_confidence_threshold}%",
+                detail=f"Face authentication failed. Confidence: {confidence_percent:.1f}%. Minimum required: {MIN_CONFIDENCE_THRESHOLD}%",
             )
 
-        if confidence_percent < min_confidence_threshold:
+        if confidence_percent < MIN_CONFIDENCE_THRESHOLD:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Confidence too low: {confidence_percent:.1f}%. Minimum required: {min_confidence_threshold}%",
+                detail=f"Confidence too low: {confidence_percent:.1f}%. Minimum required: {MIN_CONFIDENCE_THRESHOLD}%",
             )
 
         # Generate access token
-        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = auth_service.create_access_token(
-            data={"sub": user.email}, expires_delta=access_token_expires
+            data={"sub": user.email}, expires_delta=ACCESS_TOKEN_EXPIRE
         )
 
-        return FaceLoginResponse(
+        return FaceLoginResponse.model_construct(
             access_token=access_token,
             token_type="bearer",
             user={
@@ -350,7 +350,7 @@ async def face_login(
 async def test_face_recognition(
     current_user: Annotated[User, Depends(get_current_active_user)],
     email: str = Form(...),  # noqa: PT028
-    user_service: UserService = Depends(get_user_service),  # noqa: PT028
+    user_service: UserService = Depends(get_face_user_service),  # noqa: PT028
     face_image_base64: str | None = Form(None),  # noqa: PT028
     face_image_file: UploadFile | None = File(None),  # noqa: PT028
 ):
@@ -361,37 +361,21 @@ async def test_face_recognition(
     Tests if the provided face matches the enrolled face for the given email.
     Returns match result and confidence score.
     """
-    # Validate that exactly one method is provided
-    if not face_image_base64 and not face_image_file:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Either face_image_base64 or face_image_file must be provided",
-        )
-
-    if face_image_base64 and face_image_file:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Provide only one: face_image_base64 or face_image_file",
-        )
-
-    # Convert file to base64 if file was provided
-    if face_image_file:
-        contents = await face_image_file.read()
-        face_image_base64 = base64.b64encode(contents).decode("utf-8")
+    face_image_bytes = await _resolve_face_input(face_image_base64, face_image_file)
 
     try:
         # Get target user
-        target_user = await user_service.get_by_email(email=email)
+        target_user = await user_service.get_face_auth_bundle(email=email)
         if not target_user:
-            return FaceTestResponse(
+            return FaceTestResponse.model_construct(
                 match=False,
                 confidence=0.0,
                 message="User not found",
                 user=None,
             )
 
-        if not target_user.face_enrolled:
-            return FaceTestResponse(
+        if not target_user.face_enrolled or not target_user.face_embedding_encrypted:
+            return FaceTestResponse.model_construct(
                 match=False,
                 confidence=0.0,
                 message="User has not enrolled face biometrics",
@@ -400,16 +384,17 @@ async def test_face_recognition(
 
         # Test face recognition and get actual confidence score
         try:
-            verification_result = await user_service.verify_face(
+            verification_result = await user_service.verify_face_embedding(
                 user_id=target_user.id,
-                face_image_base64=face_image_base64,
+                encrypted_embedding=target_user.face_embedding_encrypted,
+                face_image_bytes=face_image_bytes,
             )
 
             # Convert confidence from 0-100 to 0-1 for frontend
             confidence_normalized = verification_result["confidence"] / 100.0
 
             if verification_result["verified"]:
-                return FaceTestResponse(
+                return FaceTestResponse.model_construct(
                     match=True,
                     confidence=confidence_normalized,
                     message="Face recognized successfully",
@@ -421,7 +406,7 @@ async def test_face_recognition(
                     },
                 )
             else:
-                return FaceTestResponse(
+                return FaceTestResponse.model_construct(
                     match=False,
                     confidence=confidence_normalized,
                     message="Face does not match enrolled biometrics",
@@ -433,7 +418,7 @@ async def test_face_recognition(
             LowQualityFaceError,
             SpoofingDetectedError,
         ) as e:
-            return FaceTestResponse(
+            return FaceTestResponse.model_construct(
                 match=False,
                 confidence=0.0,
                 message=f"Face verification failed: {str(e)}",
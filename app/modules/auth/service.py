@@ -1,36 +1,159 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import UTC, datetime, timedelta
+from functools import cache
 
+import bcrypt
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 
 from app.core.config import settings
 
+# Built once per process. New hashes use Argon2id (argon2-cffi, reference C
+# implementation); bcrypt hashes from before the migration still verify and
+# are replaced with an Argon2 hash on the user's next successful login.
+_PASSWORD_HASHER = PasswordHasher(time_cost=3, memory_cost=65536, parallelism=2)
+_BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+_JWT_ALGORITHMS = [settings.ALGORITHM]
+# Tokens without exp/sub are rejected by the decoder (callers rely on both)
+_JWT_DECODE_OPTIONS = {"require_exp": True, "require_sub": True, "verify_aud": False}
+
+ACCESS_TOKEN_EXPIRE = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+
+
+# Password hashing is CPU-bound (100+ ms per call); hash and verify in worker
+# processes so logins and sign-ups never stall the event loop.
+# Created on first use so importing this module doesn't spawn processes.
+_password_pool: ProcessPoolExecutor | None = None
+
+# By the first login this process runs thread pools and holds the face models;
+# forking it risks deadlocks and copies that memory into every worker
+_POOL_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def _get_password_pool() -> ProcessPoolExecutor:
+    global _password_pool
+
+    if _password_pool is None:
+        _password_pool = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context(_POOL_START_METHOD),
+        )
+
+    return _password_pool
+
+
+def shutdown_password_pool() -> None:
+    """Stop the password verification worker processes, if started"""
+    global _password_pool
+
+    if _password_pool is not None:
+        _password_pool.shutdown(cancel_futures=True)
+        _password_pool = None
+
+
+def _hash_password(password: str) -> str:
+    return _PASSWORD_HASHER.hash(password)
+
+
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password, dispatching on the hash scheme prefix"""
+    if hashed_password.startswith("$argon2"):
+        try:
+            return _PASSWORD_HASHER.verify(hashed_password, plain_password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    if hashed_password.startswith(_BCRYPT_PREFIXES):
+        try:
+            return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
+        except ValueError:
+            return False
+
+    return False
+
+
+@cache
+def _dummy_hash() -> str:
+    return _PASSWORD_HASHER.hash("not-a-real-password")
+
+
+def _verify_dummy_password(plain_password: str) -> bool:
+    # Same work as a real verification, so unknown emails aren't faster
+    _verify_password(plain_password, _dummy_hash())
+    return False
+
+
+def _verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    if not _verify_password(plain_password, hashed_password):
+        return False, None
+
+    is_bcrypt = hashed_password.startswith(_BCRYPT_PREFIXES)
+    if is_bcrypt or _PASSWORD_HASHER.check_needs_rehash(hashed_password):
+        return True, _PASSWORD_HASHER.hash(plain_password)
+    return True, None
+
 
 class AuthService:
     """Service for authentication and password management"""
 
-    def __init__(self):
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against a hash in the password worker pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _get_password_pool(), _verify_password, plain_password, hashed_password
+        )
+
+    async def verify_and_update_password(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        """
+        Verify a password and return a replacement hash if the stored one
+        uses a deprecated scheme or outdated parameters (None otherwise)
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _get_password_pool(),
+            _verify_and_update_password,
+            plain_password,
+            hashed_password,
+        )
+
+    async def verify_dummy_password(self, plain_password: str) -> bool:
+        """
+        Spend the same time as a real verification and return False.
+
+        Used when the user doesn't exist, so response timing doesn't reveal
+        which emails are registered.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _get_password_pool(), _verify_dummy_password, plain_password
+        )
 
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        """Verify a password against a hash"""
-        return self.pwd_context.verify(plain_password, hashed_password)
+    async def hash_password(self, password: str) -> str:
+        """Hash a password in the password worker pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _get_password_pool(), _hash_password, password
+        )
 
     def get_password_hash(self, password: str) -> str:
-        """Hash a password"""
-        return self.pwd_context.hash(password)
+        """Hash a password (blocking; use `hash_password` on the event loop)"""
+        return _hash_password(password)
 
     def create_access_token(
         self, data: dict, expires_delta: timedelta | None = None
     ) -> str:
         """Create a JWT access token"""
         to_encode = data.copy()
-        if expires_delta:
-            expire = datetime.now(UTC) + expires_delta
-        else:
-            expire = datetime.now(UTC) + timedelta(
-                minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-            )
+        expire = datetime.now(UTC) + (expires_delta or ACCESS_TOKEN_EXPIRE)
 
         to_encode.update({"exp": expire})
         encoded_jwt = jwt.encode(
@@ -38,15 +161,25 @@ class AuthService:
         )
         return encoded_jwt
 
-    def decode_access_token(self, token: str) -> str | None:
-        """Decode a JWT access token and return the email"""
+    def decode_access_token_payload(self, token: str) -> dict | None:
+        """Decode a JWT access token and return its claims if it has a subject"""
         try:
             payload = jwt.decode(
-                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+                token,
+                settings.SECRET_KEY,
+                algorithms=_JWT_ALGORITHMS,
+                options=_JWT_DECODE_OPTIONS,
             )
-            email: str = payload.get("sub")
-            if email is None:
-                return None
-            return email
         except JWTError:
             return None
+
+        if payload.get("sub") is None:
+            return None
+        return payload
+
+    def decode_access_token(self, token: str) -> str | None:
+        """Decode a JWT access token and return the email"""
+        payload = self.decode_access_token_payload(token)
+        if payload is None:
+            return None
+        return payload["sub"]
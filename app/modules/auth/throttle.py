@@ -0,0 +1,54 @@
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+
+from app.core.config import settings
+
+
+class LoginThrottle:
+    """
+    In-process token bucket per login key (client IP + email).
+
+    Each password attempt takes a token; buckets refill one token every
+    `refill_seconds` up to `capacity`. When a bucket is empty the login is
+    rejected before the (expensive) password hash is ever verified.
+    """
+
+    def __init__(
+        self, capacity: int = 5, refill_seconds: float = 10, maxsize: int = 65536
+    ):
+        self.capacity = capacity
+        self.refill_seconds = refill_seconds
+        self.maxsize = maxsize
+        self._buckets: OrderedDict[Hashable, tuple[float, float]] = OrderedDict()
+
+    def allow(self, key: Hashable) -> bool:
+        """Take a token for this key; False if none are left"""
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated_at) / self.refill_seconds)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+
+        return allowed
+
+    def reset(self, key: Hashable) -> None:
+        """Forget a key (e.g. after a successful login)"""
+        self._buckets.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all buckets"""
+        self._buckets.clear()
+
+
+login_throttle = LoginThrottle(
+    capacity=settings.LOGIN_THROTTLE_CAPACITY,
+    refill_seconds=settings.LOGIN_THROTTLE_REFILL_SECONDS,
+)
@@ -0,0 +1,62 @@
+import hashlib
+import time
+from collections import OrderedDict
+
+
+class TokenCache:
+    """
+    In-process LRU cache of verified access tokens.
+
+    Maps a JWT to the subject (email) it was issued for, until the token's
+    own expiry. Lets hot authenticated endpoints skip the HMAC verification
+    and claims parsing for tokens that were already checked. Tokens are keyed
+    by a 16-byte BLAKE2b digest, so raw bearer tokens aren't kept in memory.
+    Per process only; never persist it, it bypasses signature verification.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[bytes, tuple[str, float]] = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, token: str) -> str | None:
+        """Return the cached email for a token, or None if missing/expired"""
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        email, expires_at = entry
+        if expires_at <= time.time():
+            self._entries.pop(key, None)
+            return None
+
+        self._entries.move_to_end(key)
+        return email
+
+    def set(self, token: str, email: str, expires_at: float) -> None:
+        """Cache a verified token until its expiry timestamp"""
+        key = self._key(token)
+        self._entries[key] = (email, expires_at)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self.purge_expired()
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def purge_expired(self) -> None:
+        """Drop every entry whose token has expired"""
+        now = time.time()
+        expired = [key for key, (_, exp) in self._entries.items() if exp <= now]
+        for key in expired:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop all cached tokens"""
+        self._entries.clear()
+
+
+token_cache = TokenCache()
@@ -0,0 +1,53 @@
+import time
+from collections import OrderedDict
+
+from app.core.config import settings
+from app.modules.user.schemas import User
+
+
+class UserCache:
+    """
+    In-process TTL + LRU cache of authenticated users, keyed by email.
+
+    Holds detached `User` schemas (no session attached), so bursts of requests
+    under the same token skip the user lookup in `get_current_user`. Entries
+    are dropped by `UserService` whenever the user is changed or deleted; other
+    worker processes may still serve the old state for up to `ttl` seconds.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[User, float]] = OrderedDict()
+
+    def get(self, email: str) -> User | None:
+        """Return the cached user for an email, or None if missing/expired"""
+        entry = self._entries.get(email)
+        if entry is None:
+            return None
+
+        user, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(email, None)
+            return None
+
+        self._entries.move_to_end(email)
+        return user
+
+    def set(self, email: str, user: User) -> None:
+        """Cache a user for `ttl` seconds"""
+        self._entries[email] = (user, time.monotonic() + self.ttl)
+        self._entries.move_to_end(email)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, email: str) -> None:
+        """Drop a user from the cache (after it was changed)"""
+        self._entries.pop(email, None)
+
+    def clear(self) -> None:
+        """Drop all cached users"""
+        self._entries.clear()
+
+
+user_cache = UserCache(ttl=settings.USER_CACHE_TTL_SECONDS)
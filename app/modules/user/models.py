@@ -1,4 +1,6 @@
-from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String, Text
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 
 from app.db.database import Base
@@ -6,6 +8,17 @@ from app.db.database import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index(
+            "ix_users_face_embedding",
+            "face_embedding",
+            postgresql_using="hnsw",
+            postgresql_ops={"face_embedding": "vector_cosine_ops"},
+        ),
+    )
+    # Fetch server-generated values (id, created_at, updated_at) with
+    # RETURNING on INSERT/UPDATE, so writes don't need a refresh() SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
@@ -16,6 +29,8 @@ class User(Base):
 
     # Biometric fields for facial recognition
     face_embedding_encrypted = Column(Text, nullable=True)  # Encrypted face embedding
+    # Plain embedding for in-database matching (only with FACE_VECTOR_SEARCH)
+    face_embedding = deferred(Column(Vector(512), nullable=True))
     face_enrollment_id = Column(
         String, nullable=True
     )  # Enrollment ID from face service
@@ -1,10 +1,12 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.database import get_db
-from app.modules.auth.router import get_current_superuser
+from app.modules.auth.deps import (
+    get_auth_service,
+    get_current_superuser,
+    get_user_service,
+)
 from app.modules.auth.service import AuthService
 from app.modules.user.schemas import User, UserCreate, UserUpdate
 from app.modules.user.service import UserService
@@ -12,16 +14,6 @@ from app.modules.user.service import UserService
 router = APIRouter()
 
 
-def get_user_service(
-    db: AsyncSession = Depends(get_db),
-) -> UserService:
-    return UserService(db)
-
-
-def get_auth_service() -> AuthService:
-    return AuthService()
-
-
 @router.post("/", response_model=User, status_code=status.HTTP_201_CREATED)
 async def create_user(
     user: UserCreate,
@@ -36,7 +28,7 @@ async def create_user(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
         )
 
-    hashed_password = auth_service.get_password_hash(user.password)
+    hashed_password = await auth_service.hash_password(user.password)
     return await user_service.create(user, hashed_password)
 
 
@@ -77,7 +69,7 @@ async def update_user(
     """Update a user - Admin only"""
     hashed_password = None
     if user_update.password:
-        hashed_password = auth_service.get_password_hash(user_update.password)
+        hashed_password = await auth_service.hash_password(user_update.password)
 
     user = await user_service.update(
         user_id=user_id, user_data=user_update, hashed_password=hashed_password
@@ -1,10 +1,18 @@
+import asyncio
+import os
 import uuid
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
-from sqlalchemy import select
+from sqlalchemy import Row, bindparam, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
+from app.modules.user.cache import user_cache
 from app.modules.user.models import User
 from app.modules.user.schemas import UserCreate, UserUpdate
+from app.services.embedding_batcher import EmbeddingBatcher
 from app.services.encryption_service import EncryptionService
 from app.services.face_recognition_service import (
     FaceQuality,
@@ -16,6 +24,38 @@ from app.services.face_recognition_service import (
     SpoofingDetectedError,
 )
 
+# Face detection/embedding is CPU-bound and blocking; run it here so the
+# event loop stays free to serve other requests meanwhile. The embedding
+# batcher runs its batches on this pool too.
+FACE_POOL = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="face")
+
+
+# Hot lookups are built once; each call only binds parameters, so the
+# statement cache key is computed from an already-constructed object.
+_SELECT_BY_ID = select(User).where(User.id == bindparam("user_id"))
+_SELECT_BY_EMAIL = (
+    select(User)
+    .options(defer(User.face_embedding_encrypted))
+    .where(User.email == bindparam("email"))
+)
+_SELECT_WITH_EMBEDDING_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+_SELECT_AUTH_BY_EMAIL = select(
+    User.id,
+    User.email,
+    User.hashed_password,
+    User.is_active,
+    User.is_superuser,
+).where(User.email == bindparam("email"))
+_SELECT_FACE_AUTH_BY_EMAIL = select(
+    User.id,
+    User.email,
+    User.name,
+    User.is_active,
+    User.is_superuser,
+    User.face_enrolled,
+    User.face_embedding_encrypted,
+).where(User.email == bindparam("email"))
+
 
 class UserService:
     """Service for User business logic"""
@@ -25,37 +65,74 @@ class UserService:
         db: AsyncSession,
         face_service: FaceRecognitionService | None = None,
         encryption_service: EncryptionService | None = None,
+        embedding_batcher: EmbeddingBatcher | None = None,
+        vector_search: bool = False,
     ):
         self.db = db
         self.face_service = face_service
         self.encryption_service = encryption_service
+        self.embedding_batcher = embedding_batcher
+        self.vector_search = vector_search
 
     async def get_by_id(self, user_id: int) -> User | None:
         """Get a user by ID"""
-        result = await self.db.execute(select(User).where(User.id == user_id))
+        result = await self.db.execute(_SELECT_BY_ID, {"user_id": user_id})
         return result.scalar_one_or_none()
 
     async def get_by_email(self, email: str) -> User | None:
-        """Get a user by email"""
-        result = await self.db.execute(select(User).where(User.email == email))
+        """
+        Get a user by email.
+
+        The encrypted face embedding is not loaded: this is the lookup behind
+        every authenticated request and none of them need it. Paths that
+        verify a face load the full row through `get_by_id`.
+        """
+        result = await self.db.execute(_SELECT_BY_EMAIL, {"email": email})
         return result.scalar_one_or_none()
 
-    async def get_all(self, skip: int = 0, limit: int = 100) -> list[User]:
-        """Get all users with pagination"""
-        result = await self.db.execute(select(User).offset(skip).limit(limit))
-        return list(result.scalars().all())
+    async def get_auth_user_by_email(self, email: str) -> Row | None:
+        """
+        Get what a password login needs for a user, without loading the model.
+
+        Returns a row with id, email, hashed_password, is_active and
+        is_superuser, or None if not found.
+        """
+        result = await self.db.execute(_SELECT_AUTH_BY_EMAIL, {"email": email})
+        return result.one_or_none()
+
+    async def get_face_auth_bundle(self, email: str) -> Row | None:
+        """
+        Get what a face login needs for a user, in a single query.
+
+        Returns a row with id, email, name, is_active, is_superuser,
+        face_enrolled and face_embedding_encrypted, or None if not found.
+        """
+        result = await self.db.execute(_SELECT_FACE_AUTH_BY_EMAIL, {"email": email})
+        return result.one_or_none()
+
+    async def get_all(self, skip: int = 0, limit: int = 100) -> Sequence[User]:
+        """Get all users with pagination (ordered by id, so pages are stable)"""
+        result = await self.db.execute(
+            select(User).order_by(User.id).offset(skip).limit(limit)
+        )
+        return result.scalars().all()
 
     async def create(self, user_data: UserCreate, hashed_password: str) -> User:
         """Create a new user"""
-        db_user = User(
-            email=user_data.email,
-            name=user_data.name,
-            hashed_password=hashed_password,
-            is_superuser=user_data.is_superuser,
+        # One INSERT ... RETURNING loads every column, server defaults included,
+        # so serializing the new user never triggers a follow-up SELECT
+        result = await self.db.execute(
+            insert(User)
+            .values(
+                email=user_data.email,
+                name=user_data.name,
+                hashed_password=hashed_password,
+                is_superuser=user_data.is_superuser,
+            )
+            .returning(User)
         )
-        self.db.add(db_user)
-        await self.db.flush()
-        await self.db.refresh(db_user)
+        db_user = result.scalar_one()
+        await self.db.commit()
         return db_user
 
     async def update(
@@ -75,13 +152,23 @@ class UserService:
         if hashed_password:
             update_data["hashed_password"] = hashed_password
 
+        previous_email = db_user.email
         for field, value in update_data.items():
             setattr(db_user, field, value)
 
-        await self.db.flush()
-        await self.db.refresh(db_user)
+        await self.db.commit()
+        user_cache.pop(previous_email)
         return db_user
 
+    async def update_password_hash(self, user_id: int, hashed_password: str) -> None:
+        """Replace a user's password hash (e.g. after a scheme upgrade)"""
+        await self.db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(hashed_password=hashed_password)
+        )
+        await self.db.commit()
+
     async def delete(self, user_id: int) -> bool:
         """Delete a user"""
         db_user = await self.get_by_id(user_id)
@@ -89,7 +176,8 @@ class UserService:
             return False
 
         await self.db.delete(db_user)
-        await self.db.flush()
+        await self.db.commit()
+        user_cache.pop(db_user.email)
         return True
 
     async def authenticate(self, email: str) -> User | None:
@@ -99,10 +187,36 @@ class UserService:
             return None
         return user
 
+    async def _detect_face(
+        self, face_image_bytes: bytes, min_quality: FaceQuality
+    ) -> dict:
+        """
+        Detect a single live face and extract its embedding off the event loop.
+
+        Goes through the embedding batcher when one is configured, so
+        concurrent enrollments/verifications share one model call.
+        """
+        if self.embedding_batcher is not None:
+            return await self.embedding_batcher.submit(
+                face_image_bytes, min_quality=min_quality, check_liveness=True
+            )
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            FACE_POOL,
+            partial(
+                self.face_service.detect_face,
+                face_image_bytes,
+                min_quality=min_quality,
+                check_liveness=True,
+                allow_multiple_faces=False,
+            ),
+        )
+
     async def enroll_face(
         self,
         user_id: int,
-        face_image_base64: str,
+        face_image_bytes: bytes,
         min_quality: FaceQuality = FaceQuality.ACCEPTABLE,
     ) -> dict:
         """
@@ -110,7 +224,7 @@ class UserService:
 
         Args:
             user_id: User ID
-            face_image_base64: Face image as base64 string
+            face_image_bytes: Encoded face image (JPEG, PNG, ...)
             min_quality: Minimum required quality
 
         Returns:
@@ -129,12 +243,7 @@ class UserService:
             raise ValueError(f"User {user_id} not found")
 
         # Detect and extract face embedding
-        detection_result = self.face_service.detect_face(
-            face_image_base64,
-            min_quality=min_quality,
-            check_liveness=True,
-            allow_multiple_faces=False,
-        )
+        detection_result = await self._detect_face(face_image_bytes, min_quality)
 
         embedding = detection_result["embedding"]
         quality_score = detection_result["quality_score"]
@@ -147,12 +256,13 @@ class UserService:
 
         # Update user record
         user.face_embedding_encrypted = encrypted_embedding
+        user.face_embedding = embedding if self.vector_search else None
         user.face_enrollment_id = enrollment_id
         user.face_enrolled = True
         user.face_enrollment_quality = quality_score
 
-        await self.db.flush()
-        await self.db.refresh(user)
+        await self.db.commit()
+        user_cache.pop(user.email)
 
         return {
             "success": True,
@@ -166,7 +276,7 @@ class UserService:
     async def verify_face(
         self,
         user_id: int,
-        face_image_base64: str,
+        face_image_bytes: bytes,
         security_level: SecurityLevel = SecurityLevel.VERY_HIGH,
         min_quality: FaceQuality = FaceQuality.ACCEPTABLE,
     ) -> dict:
@@ -175,7 +285,7 @@ class UserService:
 
         Args:
             user_id: User ID
-            face_image_base64: Face image as base64 string
+            face_image_bytes: Encoded face image (JPEG, PNG, ...)
             security_level: Security level for matching
             min_quality: Minimum required quality
 
@@ -196,26 +306,72 @@ class UserService:
         if not user.face_enrolled or not user.face_embedding_encrypted:
             raise ValueError("User has not enrolled face biometric")
 
+        return await self.verify_face_embedding(
+            user_id,
+            user.face_embedding_encrypted,
+            face_image_bytes,
+            security_level=security_level,
+            min_quality=min_quality,
+        )
+
+    async def verify_face_embedding(
+        self,
+        user_id: int,
+        encrypted_embedding: str,
+        face_image_bytes: bytes,
+        security_level: SecurityLevel = SecurityLevel.VERY_HIGH,
+        min_quality: FaceQuality = FaceQuality.ACCEPTABLE,
+    ) -> dict:
+        """
+        Verify face against an enrolled biometric that was already loaded.
+
+        Args:
+            user_id: User ID the embedding belongs to
+            encrypted_embedding: The user's stored encrypted embedding
+            face_image_bytes: Encoded face image (JPEG, PNG, ...)
+            security_level: Security level for matching
+            min_quality: Minimum required quality
+
+        Returns:
+            Dictionary with verification results
+
+        Raises:
+            ValueError: If services not configured
+        """
+        if not self.face_service or not self.encryption_service:
+            raise ValueError("Face recognition services not configured")
+
+        # Detect face and extract the probe embedding
+        detection = await self._detect_face(face_image_bytes, min_quality)
+
+        # Compare inside Postgres when the plain vector is stored. Users
+        # enrolled before vector search was enabled fall back to decryption.
+        if self.vector_search:
+            result = await self.db.execute(
+                select(
+                    User.face_embedding.cosine_distance(detection["embedding"])
+                ).where(User.id == user_id)
+            )
+            distance = result.scalar_one_or_none()
+            if distance is not None:
+                return self.face_service.verify_detection_similarity(
+                    detection, 1 - distance, security_level=security_level
+                )
+
         # Decrypt stored embedding
         stored_embedding = self.encryption_service.decrypt_embedding(
-            user.face_embedding_encrypted
+            encrypted_embedding
         )
 
         # Verify face
-        verification_result = self.face_service.verify_face(
-            face_image_base64,
-            stored_embedding,
-            security_level=security_level,
-            min_quality=min_quality,
-            check_liveness=True,
+        return self.face_service.verify_detection(
+            detection, stored_embedding, security_level=security_level
         )
 
-        return verification_result
-
     async def authenticate_with_face(
         self,
         email: str,
-        face_image_base64: str,
+        face_image_bytes: bytes,
         security_level: SecurityLevel = SecurityLevel.VERY_HIGH,
     ) -> User | None:
         """
@@ -223,7 +379,7 @@ class UserService:
 
         Args:
             email: User email
-            face_image_base64: Face image as base64 string
+            face_image_bytes: Encoded face image (JPEG, PNG, ...)
             security_level: Security level for matching
 
         Returns:
@@ -232,8 +388,11 @@ class UserService:
         if not self.face_service or not self.encryption_service:
             raise ValueError("Face recognition services not configured")
 
-        # Get user by email
-        user = await self.get_by_email(email)
+        # Get user by email, with the encrypted embedding (loaded only once)
+        result = await self.db.execute(
+            _SELECT_WITH_EMBEDDING_BY_EMAIL, {"email": email}
+        )
+        user = result.scalar_one_or_none()
         if not user:
             return None
 
@@ -241,10 +400,11 @@ class UserService:
             return None
 
         try:
-            # Verify face
-            verification = await self.verify_face(
+            # Verify face against the already loaded enrollment
+            verification = await self.verify_face_embedding(
                 user.id,
-                face_image_base64,
+                user.face_embedding_encrypted,
+                face_image_bytes,
                 security_level=security_level,
                 min_quality=FaceQuality.ACCEPTABLE,
             )
@@ -0,0 +1,168 @@
+"""
+Embedding Batcher - Micro-batching for concurrent face detection requests.
+
+Collects face images submitted concurrently (e.g. a burst of face logins)
+and processes them together with `FaceRecognitionService.detect_faces_batch`,
+so the recognition model runs one batched forward pass instead of one pass
+per request. Batches are dispatched as they close, so several can run on the
+executor at once.
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from functools import lru_cache, partial
+from typing import Any
+
+from app.services.face_recognition_service import FaceQuality, FaceRecognitionService
+
+
+class EmbeddingBatcher:
+    """Gather concurrent detection requests into batched model calls."""
+
+    def __init__(
+        self,
+        face_service: FaceRecognitionService,
+        max_batch: int = 16,
+        max_wait_ms: float = 20,
+        executor: Executor | None = None,
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            face_service: Face recognition service that runs the batches
+            max_batch: Maximum number of images per batch
+            max_wait_ms: How long to wait for more images after the first one,
+                while other batches are in flight (an idle batcher doesn't wait)
+            executor: Executor for the blocking batch call (loop default if None)
+        """
+        self.face_service = face_service
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.executor = executor
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # Dispatched batches; the loop only keeps weak references to tasks
+        self._in_flight: set[asyncio.Task] = set()
+
+    async def submit(
+        self,
+        image: Any,
+        min_quality: FaceQuality = FaceQuality.ACCEPTABLE,
+        check_liveness: bool = True,
+    ) -> dict[str, Any]:
+        """
+        Queue an image for detection and wait for its result.
+
+        Args:
+            image: Input image (any format `detect_face` accepts)
+            min_quality: Minimum required face quality
+            check_liveness: Perform liveness detection
+
+        Returns:
+            Dictionary with face detection results (same as `detect_face`)
+
+        Raises:
+            Whatever `detect_face` would raise for this image
+        """
+        loop = asyncio.get_running_loop()
+        self._ensure_worker(loop)
+
+        future = loop.create_future()
+        await self._queue.put(((min_quality, check_liveness), image, future))
+        return await future
+
+    def _ensure_worker(self, loop: asyncio.AbstractEventLoop) -> None:
+        # The queue and worker are bound to the loop they were created on
+        if self._loop is loop and self._worker is not None and not self._worker.done():
+            return
+
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._worker = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            # Waiting for more images only pays off under load; an idle batcher
+            # dispatches whatever is already queued right away
+            wait = self.max_wait if self._in_flight else 0
+            deadline = loop.time() + wait
+
+            while len(batch) < self.max_batch:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except TimeoutError:
+                    break
+
+            # Don't wait for the batch: the next one can start on another
+            # executor worker meanwhile
+            task = loop.create_task(self._process(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _process(self, batch: list[tuple[tuple, Any, asyncio.Future]]) -> None:
+        loop = asyncio.get_running_loop()
+
+        # Requests with different detection options can't share a call
+        groups: dict[tuple, list[tuple[Any, asyncio.Future]]] = {}
+        for options, image, future in batch:
+            groups.setdefault(options, []).append((image, future))
+
+        for (min_quality, check_liveness), items in groups.items():
+            try:
+                results = await loop.run_in_executor(
+                    self.executor,
+                    partial(
+                        self.face_service.detect_faces_batch,
+                        [image for image, _ in items],
+                        min_quality=min_quality,
+                        check_liveness=check_liveness,
+                    ),
+                )
+            except Exception as e:
+                results = [e] * len(items)
+
+            for (_, future), result in zip(items, results, strict=True):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+@lru_cache(maxsize=4)
+def get_embedding_batcher(
+    face_service: FaceRecognitionService,
+    max_batch: int = 16,
+    max_wait_ms: float = 20,
+    executor: Executor | None = None,
+) -> EmbeddingBatcher:
+    """
+    Get or create the embedding batcher for a service and batch settings.
+
+    Instances are cached per argument combination, so concurrent requests with
+    the same settings share one batcher (and its queue).
+
+    Args:
+        face_service: Face recognition service that runs the batches
+        max_batch: Maximum number of images per batch
+        max_wait_ms: How long to wait for more images after the first one
+        executor: Executor for the blocking batch calls (loop default if None)
+
+    Returns:
+        EmbeddingBatcher instance
+    """
+    return EmbeddingBatcher(
+        face_service, max_batch=max_batch, max_wait_ms=max_wait_ms, executor=executor
+    )
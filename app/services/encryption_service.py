@@ -2,65 +2,190 @@
 Encryption Service for Face Embeddings
 
 Provides secure encryption/decryption for storing face embeddings in database.
-Uses Fernet (symmetric encryption) from cryptography library.
+Uses Fernet (symmetric encryption) from cryptography library, or optionally
+AES-256-GCM with a key derived from the same Fernet key.
 """
 
-import base64
-import json
-from typing import List
+import hashlib
+import os
+from collections import OrderedDict
+from functools import cached_property, lru_cache
 
+import numpy as np
+import orjson
+import pybase64
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+# Plaintext layout of an embedding starts with a format byte. Quantized
+# embeddings follow it with a float32 scale (little-endian) and one int8 per
+# dimension; full-precision ones with little-endian float32 values. Embeddings
+# stored before either format are JSON lists, which always start with "[".
+_INT8_FORMAT = b"\x01"
+_FLOAT32_FORMAT = b"\x02"
+_SCALE_DTYPE = np.dtype("<f4")
+_FLOAT32_DTYPE = np.dtype("<f4")
+
+# Fernet tokens are already URL-safe base64 and always start with the version
+# byte 0x80 ("gAAAAA"). Older rows wrapped the token in another base64 layer.
+_FERNET_TOKEN_PREFIX = "gAAAAA"
+
+# AES-GCM tokens: prefix, then URL-safe base64 of nonce || ciphertext || tag.
+# The prefix can't start a Fernet token or the legacy base64 wrapping of one.
+_AES_GCM_PREFIX = "gcm1:"
+_AES_GCM_NONCE_SIZE = 12
+
+
+@lru_cache(maxsize=8)
+def _get_cipher(encryption_key: str) -> Fernet:
+    # Fernet is stateless once built; share one per key so constructing an
+    # EncryptionService doesn't re-parse the key every time
+    return Fernet(encryption_key.encode())
+
+
+@lru_cache(maxsize=8)
+def _get_aead(encryption_key: str) -> AESGCM:
+    # Derive a separate AES-256 key rather than reusing the Fernet key bytes
+    key_material = pybase64.urlsafe_b64decode(encryption_key)
+    key = HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=None,
+        info=b"face-embedding-aes-gcm",
+    ).derive(key_material)
+    return AESGCM(key)
 
 
 class EncryptionService:
     """Service for encrypting and decrypting face embeddings."""
 
-    def __init__(self, encryption_key: str):
+    def __init__(
+        self,
+        encryption_key: str,
+        quantize: bool = True,
+        use_aes_gcm: bool = False,
+        cache_size: int = 1024,
+    ):
         """
         Initialize encryption service.
 
         Args:
             encryption_key: Base64-encoded Fernet key (32 bytes)
+            quantize: Store embeddings as int8 instead of raw float32
+            use_aes_gcm: Encrypt new embeddings with AES-256-GCM instead of
+                Fernet (both are always accepted when decrypting)
+            cache_size: How many decrypted embeddings to keep for repeated
+                verifications of the same user (0 disables the cache)
         """
-        self.cipher = Fernet(encryption_key.encode())
-
-    def encrypt_embedding(self, embedding: List[float]) -> str:
+        self.cipher = _get_cipher(encryption_key)
+        self._encryption_key = encryption_key
+        self.quantize = quantize
+        self.use_aes_gcm = use_aes_gcm
+        self.cache_size = cache_size
+        # Keyed by a digest of the stored ciphertext, so a re-enrollment (new
+        # ciphertext) never hits a stale entry; old ones just age out
+        self._decrypted: OrderedDict[bytes, np.ndarray] = OrderedDict()
+
+    @cached_property
+    def aead(self) -> AESGCM:
+        """AES-256-GCM cipher, derived on first use (only GCM tokens need it)."""
+        return _get_aead(self._encryption_key)
+
+    def encrypt_embedding(self, embedding: np.ndarray | list[float]) -> str:
         """
         Encrypt face embedding for storage.
 
         Args:
-            embedding: Face embedding as list of floats
+            embedding: Face embedding (float32 array; lists are converted)
 
         Returns:
-            Encrypted embedding as base64 string
+            Encrypted embedding as a token string (Fernet or AES-GCM)
         """
-        # Convert embedding to JSON string
-        embedding_json = json.dumps(embedding)
-
-        # Encrypt
-        encrypted = self.cipher.encrypt(embedding_json.encode())
-
-        # Return as base64 string for storage
-        return base64.b64encode(encrypted).decode()
-
-    def decrypt_embedding(self, encrypted_embedding: str) -> List[float]:
+        values = np.asarray(embedding, dtype=np.float32)
+        if self.quantize:
+            # Quantize to int8 with a single per-vector scale. ~4x smaller than
+            # float32 (and far smaller than JSON) with negligible similarity error.
+            peak = float(np.max(np.abs(values))) if values.size else 0.0
+            scale = np.array(peak / 127 if peak else 1.0, dtype=_SCALE_DTYPE)
+            quantized = np.round(values / scale).astype(np.int8)
+            payload = _INT8_FORMAT + scale.tobytes() + quantized.tobytes()
+        else:
+            payload = _FLOAT32_FORMAT + values.astype(_FLOAT32_DTYPE).tobytes()
+
+        # Encrypt. AES-GCM is a single authenticated pass with no padding;
+        # a random 96-bit nonce per embedding keeps nonce reuse negligible.
+        if self.use_aes_gcm:
+            nonce = os.urandom(_AES_GCM_NONCE_SIZE)
+            sealed = nonce + self.aead.encrypt(nonce, payload, None)
+            return _AES_GCM_PREFIX + pybase64.urlsafe_b64encode(sealed).decode("ascii")
+
+        # The Fernet token is already base64, ready for storage
+        return self.cipher.encrypt(payload).decode("ascii")
+
+    def decrypt_embedding(self, encrypted_embedding: str) -> np.ndarray:
         """
         Decrypt face embedding from storage.
 
         Args:
-            encrypted_embedding: Encrypted embedding as base64 string
+            encrypted_embedding: Encrypted embedding (Fernet or AES-GCM token)
 
         Returns:
-            Face embedding as list of floats
+            Face embedding as a float32 array (read-only)
         """
-        # Decode from base64
-        encrypted = base64.b64decode(encrypted_embedding.encode())
-
-        # Decrypt
-        decrypted = self.cipher.decrypt(encrypted)
-
-        # Parse JSON and return
-        return json.loads(decrypted.decode())
+        if not self.cache_size:
+            return self._decrypt(encrypted_embedding)
+
+        key = hashlib.blake2b(encrypted_embedding.encode(), digest_size=16).digest()
+        embedding = self._decrypted.get(key)
+        if embedding is not None:
+            self._decrypted.move_to_end(key)
+            return embedding
+
+        embedding = self._decrypt(encrypted_embedding)
+        embedding.flags.writeable = False
+        self._decrypted[key] = embedding
+        while len(self._decrypted) > self.cache_size:
+            self._decrypted.popitem(last=False)
+        return embedding
+
+    def clear_cache(self) -> None:
+        """Drop all cached decrypted embeddings"""
+        self._decrypted.clear()
+
+    def _decrypt(self, encrypted_embedding: str) -> np.ndarray:
+        if encrypted_embedding.startswith(_AES_GCM_PREFIX):
+            sealed = pybase64.urlsafe_b64decode(
+                encrypted_embedding[len(_AES_GCM_PREFIX) :]
+            )
+            decrypted = self.aead.decrypt(
+                sealed[:_AES_GCM_NONCE_SIZE], sealed[_AES_GCM_NONCE_SIZE:], None
+            )
+        else:
+            encrypted = encrypted_embedding.encode("ascii")
+
+            # Legacy rows: unwrap the extra base64 layer
+            if not encrypted_embedding.startswith(_FERNET_TOKEN_PREFIX):
+                encrypted = pybase64.b64decode(encrypted)
+
+            decrypted = self.cipher.decrypt(encrypted)
+
+        # Dequantize
+        if decrypted[:1] == _INT8_FORMAT:
+            scale = np.frombuffer(decrypted, dtype=_SCALE_DTYPE, count=1, offset=1)
+            quantized = np.frombuffer(
+                decrypted, dtype=np.int8, offset=1 + _SCALE_DTYPE.itemsize
+            )
+            return quantized.astype(np.float32) * scale[0]
+
+        if decrypted[:1] == _FLOAT32_FORMAT:
+            return np.frombuffer(decrypted, dtype=_FLOAT32_DTYPE, offset=1).astype(
+                np.float32, copy=False
+            )
+
+        # Legacy format: parse JSON and return
+        return np.asarray(orjson.loads(decrypted), dtype=np.float32)
 
     @staticmethod
     def generate_key() -> str:
@@ -77,23 +202,20 @@ class EncryptionService:
         return Fernet.generate_key().decode()
 
 
-# Singleton instance
-_encryption_service: EncryptionService | None = None
-
-
-def get_encryption_service(encryption_key: str) -> EncryptionService:
+@lru_cache(maxsize=4)
+def get_encryption_service(
+    encryption_key: str, use_aes_gcm: bool = False
+) -> EncryptionService:
     """
-    Get or create encryption service instance.
+    Get or create the encryption service instance for a key.
+
+    Instances are cached per key, so the Fernet key is parsed only once.
 
     Args:
         encryption_key: Encryption key from config
+        use_aes_gcm: Encrypt new embeddings with AES-256-GCM
 
     Returns:
         EncryptionService instance
     """
-    global _encryption_service
-
-    if _encryption_service is None:
-        _encryption_service = EncryptionService(encryption_key)
-
-    return _encryption_service
+    return EncryptionService(encryption_key, use_aes_gcm=use_aes_gcm)
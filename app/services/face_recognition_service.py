@@ -12,16 +12,84 @@ This is a standalone utility that can be reused in other projects.
 It does not interact with databases or perform business logic.
 """
 
-import base64
+import threading
 from enum import Enum
+from functools import cached_property
 from typing import Any
 
 import cv2
-import mediapipe as mp
 import numpy as np
+import onnxruntime as ort
+import pybase64
 from insightface.app import FaceAnalysis
+from insightface.app.common import Face
+from insightface.utils import face_align
 from PIL import Image
-from scipy.spatial.distance import cosine
+
+# ONNX Runtime providers in order of preference; the first ones available in
+# the installed onnxruntime build are used (CPU is always the fallback)
+PREFERRED_PROVIDERS = ["CUDAExecutionProvider", "CPUExecutionProvider"]
+
+
+def get_default_providers() -> list[str]:
+    """Return the preferred ONNX Runtime providers available on this machine."""
+    available = set(ort.get_available_providers())
+    providers = [p for p in PREFERRED_PROVIDERS if p in available]
+    return providers or ["CPUExecutionProvider"]
+
+
+# Added to cosine denominators: a zero (e.g. corrupted) embedding then scores
+# 0 similarity instead of raising or producing nan
+_NORM_EPS = 1e-12
+
+
+def _to_np(embedding: np.ndarray | list[float]) -> np.ndarray:
+    """Return an embedding as a float32 array, converting only when needed."""
+    if isinstance(embedding, np.ndarray) and embedding.dtype == np.float32:
+        return embedding
+    return np.asarray(embedding, dtype=np.float32)
+
+
+# Prepared InsightFace pipelines, shared by every service built with the same
+# model/providers/context/input size. Loading one reads hundreds of MB of
+# ONNX weights, so it must not happen again on each FaceRecognitionService.
+_FACE_APP_CACHE: dict[tuple, FaceAnalysis] = {}
+_FACE_APP_LOCK = threading.Lock()
+
+
+def _get_face_app(
+    model_name: str, providers: list[str], ctx_id: int, det_size: tuple[int, int]
+) -> FaceAnalysis:
+    """Return the prepared FaceAnalysis for this configuration, loading it once."""
+    key = (model_name, tuple(providers), ctx_id, det_size)
+    app = _FACE_APP_CACHE.get(key)
+    if app is not None:
+        return app
+
+    with _FACE_APP_LOCK:
+        app = _FACE_APP_CACHE.get(key)
+        if app is None:
+            app = FaceAnalysis(name=model_name, providers=providers)
+            app.prepare(ctx_id=ctx_id, det_size=det_size)
+            _warmup_face_app(app, det_size)
+            _FACE_APP_CACHE[key] = app
+    return app
+
+
+def _warmup_face_app(app: FaceAnalysis, det_size: tuple[int, int]) -> None:
+    """
+    Run one dummy pass through the detection and recognition models.
+
+    ONNX Runtime allocates its memory arenas (and, on GPU, initializes CUDA
+    and picks convolution kernels) on the first inference; doing it here keeps
+    that cost out of the first real request.
+    """
+    app.get(np.zeros((det_size[1], det_size[0], 3), dtype=np.uint8))
+
+    rec_model = app.models.get("recognition")
+    if rec_model is not None:
+        size = rec_model.input_size[0]
+        rec_model.get_feat([np.zeros((size, size, 3), dtype=np.uint8)])
 
 
 class FaceQuality(Enum):
@@ -72,6 +140,120 @@ class SpoofingDetectedError(FaceRecognitionError):
     pass
 
 
+class EmbeddingIndex:
+    """
+    In-memory set of face embeddings laid out for batch comparison.
+
+    Embeddings live in one contiguous (N, D) float32 matrix with a parallel
+    list of ids, so `FaceRecognitionService.batch_compare` can score them all
+    with a single matrix-vector product instead of rebuilding arrays per call.
+    The matrix grows by doubling; removal moves the last row into the gap.
+    """
+
+    __slots__ = ("ids", "_matrix", "_norms", "_positions")
+
+    def __init__(self, dim: int = 512, capacity: int = 64):
+        """
+        Initialize an empty index.
+
+        Args:
+            dim: Embedding dimension
+            capacity: Number of rows to preallocate
+        """
+        self.ids: list[str] = []
+        self._matrix = np.empty((max(capacity, 1), dim), dtype=np.float32)
+        self._norms = np.empty(max(capacity, 1), dtype=np.float32)
+        self._positions: dict[str, int] = {}
+
+    @classmethod
+    def from_pairs(
+        cls, pairs: list[tuple[str, np.ndarray | list[float]]], dim: int = 512
+    ) -> "EmbeddingIndex":
+        """Build an index from (id, embedding) tuples."""
+        index = cls(dim=dim, capacity=len(pairs))
+        if not pairs:
+            return index
+
+        ids = [face_id for face_id, _ in pairs]
+        positions = {face_id: i for i, face_id in enumerate(ids)}
+        if len(positions) != len(ids):
+            # Duplicate ids: let add() keep the last embedding for each
+            for face_id, embedding in pairs:
+                index.add(face_id, embedding)
+            return index
+
+        matrix = np.asarray([embedding for _, embedding in pairs], dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[1] != dim:
+            raise ValueError(f"Embedding size mismatch: {matrix.shape[-1]} != {dim}")
+
+        index.ids = ids
+        index._positions = positions
+        index._matrix = matrix
+        index._norms = np.linalg.norm(matrix, axis=1)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, face_id: str) -> bool:
+        return face_id in self._positions
+
+    @property
+    def dim(self) -> int:
+        return self._matrix.shape[1]
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """The (N, D) embedding matrix (a view; don't modify it)."""
+        return self._matrix[: len(self.ids)]
+
+    @property
+    def norms(self) -> np.ndarray:
+        """L2 norm of each row of `matrix`."""
+        return self._norms[: len(self.ids)]
+
+    def add(self, face_id: str, embedding: np.ndarray | list[float]) -> None:
+        """Add an embedding, replacing the existing one for the same id."""
+        vector = _to_np(embedding)
+        if vector.shape != (self.dim,):
+            raise ValueError(f"Embedding size mismatch: {vector.size} != {self.dim}")
+
+        position = self._positions.get(face_id)
+        if position is None:
+            position = len(self.ids)
+            if position == self._matrix.shape[0]:
+                self._grow()
+            self.ids.append(face_id)
+            self._positions[face_id] = position
+
+        self._matrix[position] = vector
+        self._norms[position] = np.linalg.norm(vector)
+
+    def remove(self, face_id: str) -> bool:
+        """Remove an embedding. Returns False if the id isn't indexed."""
+        position = self._positions.pop(face_id, None)
+        if position is None:
+            return False
+
+        last = len(self.ids) - 1
+        if position != last:
+            moved_id = self.ids[last]
+            self._matrix[position] = self._matrix[last]
+            self._norms[position] = self._norms[last]
+            self.ids[position] = moved_id
+            self._positions[moved_id] = position
+        self.ids.pop()
+        return True
+
+    def _grow(self) -> None:
+        capacity = self._matrix.shape[0] * 2
+        matrix = np.empty((capacity, self.dim), dtype=np.float32)
+        matrix[: len(self.ids)] = self.matrix
+        norms = np.empty(capacity, dtype=np.float32)
+        norms[: len(self.ids)] = self.norms
+        self._matrix, self._norms = matrix, norms
+
+
 class FaceRecognitionService:
     """
     Comprehensive face recognition service with security features.
@@ -89,126 +271,239 @@ class FaceRecognitionService:
         model_name: str = "buffalo_l",
         providers: list[str] | None = None,
         use_mediapipe: bool = True,
+        max_image_side: int | None = 1280,
+        use_opencl: bool = False,
+        det_size: tuple[int, int] = (640, 640),
     ):
         """
         Initialize the face recognition service.
 
         Args:
             model_name: InsightFace model name (buffalo_l, buffalo_s, etc.)
-            providers: ONNX Runtime providers (e.g., ['CUDAExecutionProvider'])
+            providers: ONNX Runtime providers (e.g., ['CUDAExecutionProvider']).
+                Auto-detected (GPU when available, else CPU) if None.
             use_mediapipe: Enable MediaPipe for additional validation
+            max_image_side: Downscale larger images so their longest side is
+                at most this many pixels (None keeps the original size).
+                Returned geometry (bbox, landmarks) and the reported
+                resolution stay in the uploaded image's coordinates
+            use_opencl: Run the full-image OpenCV passes (grayscale, blur) on
+                an OpenCL device via cv2.UMat; ignored when none is available
+            det_size: Detector input size; cost grows with its area
         """
+        self.max_image_side = max_image_side
+        self.use_opencl = use_opencl and cv2.ocl.haveOpenCL()
+
         # Initialize InsightFace
-        self.app = FaceAnalysis(
-            name=model_name,
-            providers=providers or ["CPUExecutionProvider"],
-        )
-        self.app.prepare(ctx_id=0, det_size=(640, 640))
+        self.providers = providers or get_default_providers()
+        # ctx_id -1 keeps InsightFace on CPU; 0 selects the first GPU
+        ctx_id = 0 if "CUDAExecutionProvider" in self.providers else -1
+        self.app = _get_face_app(model_name, self.providers, ctx_id, det_size)
 
-        # Initialize MediaPipe (for anti-spoofing and quality checks)
+        # MediaPipe models (anti-spoofing and quality checks) are built on
+        # first use; the current liveness heuristic doesn't need them
         self.use_mediapipe = use_mediapipe
-        if use_mediapipe:
-            self.mp_face_detection = mp.solutions.face_detection.FaceDetection(
-                model_selection=1, min_detection_confidence=0.5
-            )
-            self.mp_face_mesh = mp.solutions.face_mesh.FaceMesh(
-                static_image_mode=True,
-                max_num_faces=1,
-                refine_landmarks=True,
-                min_detection_confidence=0.5,
-            )
 
-    def _load_image(self, image_input: Any) -> np.ndarray:
+    @classmethod
+    def fast_verify(
+        cls,
+        model_name: str = "buffalo_l",
+        providers: list[str] | None = None,
+        **kwargs: Any,
+    ) -> "FaceRecognitionService":
         """
-        Load image from various input formats.
+        Build a service tuned for verification of a single, close-up face.
+
+        Uses a 320x320 detector input (4x cheaper than 640x640) and skips
+        MediaPipe. Liveness detection still runs whenever `check_liveness` is
+        set; its heuristic only needs OpenCV. Keep the default service for
+        registration, where the embedding must come from the best possible
+        detection.
+
+        Args:
+            model_name: InsightFace model name
+            providers: ONNX Runtime providers
+            **kwargs: Any other `__init__` argument, overriding the preset
+
+        Returns:
+            FaceRecognitionService instance
+        """
+        kwargs.setdefault("det_size", (320, 320))
+        kwargs.setdefault("use_mediapipe", False)
+        return cls(model_name=model_name, providers=providers, **kwargs)
+
+    @cached_property
+    def mp_face_detection(self) -> Any:
+        """MediaPipe face detector, loaded on first access."""
+        import mediapipe as mp
+
+        return mp.solutions.face_detection.FaceDetection(
+            model_selection=1, min_detection_confidence=0.5
+        )
+
+    @cached_property
+    def mp_face_mesh(self) -> Any:
+        """MediaPipe face mesh, loaded on first access."""
+        import mediapipe as mp
+
+        return mp.solutions.face_mesh.FaceMesh(
+            static_image_mode=True,
+            max_num_faces=1,
+            refine_landmarks=True,
+            min_detection_confidence=0.5,
+        )
+
+    def _load_image(self, image_input: Any) -> tuple[np.ndarray, float]:
+        """
+        Load image from various input formats, capped at `max_image_side`.
+
+        The detector runs at 640x640 anyway; shrinking very large uploads once
+        makes every later full-image pass (grayscale, blur, detector resize)
+        proportionally cheaper.
 
         Args:
             image_input: Can be np.ndarray, PIL Image, bytes, or base64 string
 
         Returns:
-            numpy array in BGR format (OpenCV format)
+            Tuple of (numpy array in BGR format (OpenCV format), scale factor
+            applied to the decoded image; 1.0 when it wasn't resized)
 
         Raises:
             ValueError: If image format is not supported
         """
-        if isinstance(image_input, np.ndarray):
-            # Already a numpy array
-            if len(image_input.shape) == 2:  # Grayscale
-                return cv2.cvtColor(image_input, cv2.COLOR_GRAY2BGR)
-            elif image_input.shape[2] == 4:  # RGBA
-                return cv2.cvtColor(image_input, cv2.COLOR_RGBA2BGR)
-            elif image_input.shape[2] == 3:
-                # Check if RGB or BGR
-                return image_input
-            else:
-                raise ValueError(f"Unsupported image shape: {image_input.shape}")
-
-        elif isinstance(image_input, Image.Image):
-            # PIL Image
-            img_array = np.array(image_input)
-            if len(img_array.shape) == 2:  # Grayscale
-                return cv2.cvtColor(img_array, cv2.COLOR_GRAY2BGR)
-            elif img_array.shape[2] == 4:  # RGBA
-                return cv2.cvtColor(img_array, cv2.COLOR_RGBA2BGR)
-            else:  # RGB
-                return cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
-
-        elif isinstance(image_input, bytes):
-            # Bytes
-            img_array = np.frombuffer(image_input, dtype=np.uint8)
-            img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
-            if img is None:
-                raise ValueError("Failed to decode image from bytes")
-            return img
+        img = self._decode_image(image_input)
 
-        elif isinstance(image_input, str):
-            # Base64 string
-            try:
-                # Remove data URL prefix if present
-                if "," in image_input:
-                    image_input = image_input.split(",")[1]
-                img_bytes = base64.b64decode(image_input)
-                img_array = np.frombuffer(img_bytes, dtype=np.uint8)
-                img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
-                if img is None:
-                    raise ValueError("Failed to decode base64 image")
-                return img
-            except Exception as e:
-                raise ValueError(f"Invalid base64 string: {str(e)}") from e
+        height, width = img.shape[:2]
+        longest = max(height, width)
+        if not self.max_image_side or longest <= self.max_image_side:
+            return img, 1.0
+
+        scale = self.max_image_side / longest
+        img = cv2.resize(
+            img,
+            (max(1, round(width * scale)), max(1, round(height * scale))),
+            interpolation=cv2.INTER_AREA,
+        )
+        return img, scale
 
-        else:
+    def _decode_image(self, image_input: Any) -> np.ndarray:
+        """
+        Decode image from various input formats.
+
+        Args:
+            image_input: Can be np.ndarray, PIL Image, bytes, or base64 string
+
+        Returns:
+            numpy array in BGR format (OpenCV format)
+
+        Raises:
+            ValueError: If image format is not supported
+        """
+        # Exact type lookup first (bytes on every API request); subclasses,
+        # e.g. PIL's JpegImageFile, fall back to an isinstance scan
+        decoder = self._DECODERS.get(type(image_input))
+        if decoder is None:
+            decoder = next(
+                (
+                    decoder
+                    for input_type, decoder in self._DECODERS.items()
+                    if isinstance(image_input, input_type)
+                ),
+                None,
+            )
+        if decoder is None:
             raise ValueError(
                 f"Unsupported image type: {type(image_input)}. "
                 "Supported types: np.ndarray, PIL.Image, bytes, base64 string"
             )
-
-    def _check_image_quality(self, img: np.ndarray) -> dict[str, Any]:
+        return decoder(self, image_input)
+
+    def _decode_bytes(self, image_input: bytes) -> np.ndarray:
+        img_array = np.frombuffer(image_input, dtype=np.uint8)
+        img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
+        if img is None:
+            raise ValueError("Failed to decode image from bytes")
+        return img
+
+    def _decode_base64(self, image_input: str) -> np.ndarray:
+        try:
+            # Remove data URL prefix if present
+            _, comma, payload = image_input.partition(",")
+            if comma:
+                image_input = payload
+            img_bytes = pybase64.b64decode(image_input)
+            img_array = np.frombuffer(img_bytes, dtype=np.uint8)
+            img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
+            if img is None:
+                raise ValueError("Failed to decode base64 image")
+            return img
+        except Exception as e:
+            raise ValueError(f"Invalid base64 string: {str(e)}") from e
+
+    def _decode_ndarray(self, image_input: np.ndarray) -> np.ndarray:
+        if len(image_input.shape) == 2:  # Grayscale
+            return cv2.cvtColor(image_input, cv2.COLOR_GRAY2BGR)
+        elif image_input.shape[2] == 4:  # RGBA
+            return cv2.cvtColor(image_input, cv2.COLOR_RGBA2BGR)
+        elif image_input.shape[2] == 3:
+            # Check if RGB or BGR
+            return image_input
+        else:
+            raise ValueError(f"Unsupported image shape: {image_input.shape}")
+
+    def _decode_pil(self, image_input: Image.Image) -> np.ndarray:
+        img_array = np.array(image_input)
+        if len(img_array.shape) == 2:  # Grayscale
+            return cv2.cvtColor(img_array, cv2.COLOR_GRAY2BGR)
+        elif img_array.shape[2] == 4:  # RGBA
+            return cv2.cvtColor(img_array, cv2.COLOR_RGBA2BGR)
+        else:  # RGB
+            return cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
+
+    _DECODERS = {
+        bytes: _decode_bytes,
+        str: _decode_base64,
+        np.ndarray: _decode_ndarray,
+        Image.Image: _decode_pil,
+    }
+
+    def _check_image_quality(
+        self,
+        img: np.ndarray,
+        gray: np.ndarray | cv2.UMat | None = None,
+        scale: float = 1.0,
+    ) -> dict[str, Any]:
         """
         Check basic image quality metrics.
 
         Args:
             img: Image in BGR format
+            gray: Grayscale version of `img`, if already computed (may be a
+                cv2.UMat, keeping the blur pass on the OpenCL device)
+            scale: Factor `img` was downscaled by; the resolution is checked
+                (and reported) at the uploaded size
 
         Returns:
             Dictionary with quality metrics
         """
         # Check resolution
-        height, width = img.shape[:2]
+        height, width = (round(side / scale) for side in img.shape[:2])
         min_resolution = 200
         resolution_ok = height >= min_resolution and width >= min_resolution
 
-        # Check brightness
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        mean_brightness = np.mean(gray)
+        # Check brightness and contrast (mean and std in a single pass)
+        if gray is None:
+            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        mean, std = cv2.meanStdDev(gray)
+        mean_brightness = float(mean[0, 0])
         brightness_ok = 30 < mean_brightness < 225
 
-        # Check contrast
-        contrast = gray.std()
+        contrast = float(std[0, 0])
         contrast_ok = contrast > 20
 
         # Check blur (Laplacian variance)
         laplacian = cv2.Laplacian(gray, cv2.CV_64F)
-        blur_score = laplacian.var()
+        blur_score = float(cv2.meanStdDev(laplacian)[1][0, 0]) ** 2
         sharpness_ok = blur_score > 10  # More tolerant threshold (was 100)
 
         return {
@@ -220,13 +515,16 @@ class FaceRecognitionService:
             "contrast_ok": contrast_ok,
             "blur_score": float(blur_score),
             "sharpness_ok": sharpness_ok,
-            "overall_ok": all(
-                [resolution_ok, brightness_ok, contrast_ok, sharpness_ok]
+            "overall_ok": bool(
+                resolution_ok and brightness_ok and contrast_ok and sharpness_ok
             ),
         }
 
     def _detect_liveness(
-        self, img: np.ndarray, face_bbox: list[float]
+        self,
+        img: np.ndarray,
+        face_bbox: list[float],
+        gray: np.ndarray | None = None,
     ) -> dict[str, Any]:
         """
         Perform basic liveness detection to prevent spoofing.
@@ -240,13 +538,11 @@ class FaceRecognitionService:
         Args:
             img: Image in BGR format
             face_bbox: Face bounding box [x1, y1, x2, y2]
+            gray: Grayscale version of `img`, if already computed
 
         Returns:
             Dictionary with liveness metrics
         """
-        if not self.use_mediapipe:
-            return {"liveness_check": False, "risk_level": "unknown"}
-
         # Extract face region
         x1, y1, x2, y2 = [int(coord) for coord in face_bbox]
         face_img = img[y1:y2, x1:x2]
@@ -264,7 +560,10 @@ class FaceRecognitionService:
         color_variety = float(np.mean(color_std))
 
         # Check texture (real faces have more texture detail)
-        gray_face = cv2.cvtColor(face_img, cv2.COLOR_BGR2GRAY)
+        if gray is not None:
+            gray_face = gray[y1:y2, x1:x2]
+        else:
+            gray_face = cv2.cvtColor(face_img, cv2.COLOR_BGR2GRAY)
         edges = cv2.Canny(gray_face, 50, 150)
         edge_density = float(np.sum(edges > 0) / edges.size)
 
@@ -328,40 +627,92 @@ class FaceRecognitionService:
 
         return max(0, min(100, score))
 
-    def detect_face(
-        self,
-        image: Any,
-        min_quality: FaceQuality = FaceQuality.ACCEPTABLE,
-        check_liveness: bool = True,
-        allow_multiple_faces: bool = False,
-    ) -> dict[str, Any]:
+    def _get_faces(self, img: np.ndarray, with_embedding: bool = True) -> list[Any]:
         """
-        Detect face in image and extract information.
+        Run InsightFace detection and per-face analysis models.
 
         Args:
-            image: Input image (various formats supported)
-            min_quality: Minimum required face quality
-            check_liveness: Perform liveness detection
-            allow_multiple_faces: Allow multiple faces in image
+            img: Image in BGR format
+            with_embedding: Also run the recognition model on each face
 
         Returns:
-            Dictionary with face detection results
+            List of InsightFace face objects
+        """
+        if with_embedding:
+            return self.app.get(img)
+
+        # Same as FaceAnalysis.get, minus the recognition model, so the
+        # embeddings can be computed later in a single batched forward pass
+        bboxes, kpss = self.app.det_model.detect(img, max_num=0, metric="default")
+        faces = []
+        for i in range(bboxes.shape[0]):
+            face = Face(
+                bbox=bboxes[i, 0:4],
+                kps=kpss[i] if kpss is not None else None,
+                det_score=bboxes[i, 4],
+            )
+            for taskname, model in self.app.models.items():
+                if taskname in ("detection", "recognition"):
+                    continue
+                model.get(img, face)
+            faces.append(face)
+        return faces
+
+    def _embed_faces(self, items: list[tuple[np.ndarray, Any]]) -> None:
+        """
+        Compute embeddings for several faces in one recognition forward pass.
+
+        Args:
+            items: List of (BGR image, InsightFace face object) pairs.
+                Each face gets its `embedding` attribute set in place.
+        """
+        rec_model = self.app.models["recognition"]
+        crops = [
+            face_align.norm_crop(
+                img, landmark=face.kps, image_size=rec_model.input_size[0]
+            )
+            for img, face in items
+        ]
+        embeddings = rec_model.get_feat(crops)
+        for (_, face), embedding in zip(items, embeddings, strict=True):
+            face.embedding = embedding.flatten()
+
+    def _detect_single_face(
+        self,
+        image: Any,
+        allow_multiple_faces: bool,
+        with_embedding: bool = True,
+    ) -> tuple[np.ndarray, np.ndarray, dict[str, Any], Any, float]:
+        """
+        Load image, validate its quality and detect the face to process.
+
+        Returns:
+            Tuple of (BGR image, grayscale image, image quality metrics,
+            InsightFace face object, scale the image was downscaled by). The
+            face geometry is in the downscaled image's coordinates.
 
         Raises:
             NoFaceDetectedError: No face found
             MultipleFacesError: Multiple faces found when not allowed
-            LowQualityFaceError: Face quality too low
-            SpoofingDetectedError: Potential spoofing detected
+            LowQualityFaceError: Image quality too low
         """
         # Load and validate image
-        img = self._load_image(image)
-        image_quality = self._check_image_quality(img)
+        img, scale = self._load_image(image)
+        # Converted once; the quality check and liveness both read it
+        if self.use_opencl:
+            gray_umat = cv2.cvtColor(cv2.UMat(img), cv2.COLOR_BGR2GRAY)
+            image_quality = self._check_image_quality(img, gray_umat, scale)
+            # Liveness slices the face crop, which needs a numpy array
+            gray = gray_umat.get()
+        else:
+            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+            image_quality = self._check_image_quality(img, gray, scale)
 
         if not image_quality["overall_ok"]:
             raise LowQualityFaceError(f"Image quality too low: {image_quality}")
 
         # Detect faces
-        faces = self.app.get(img)
+        faces = self._get_faces(img, with_embedding=with_embedding)
 
         if len(faces) == 0:
             raise NoFaceDetectedError("No face detected in image")
@@ -372,48 +723,84 @@ class FaceRecognitionService:
             )
 
         # Process the first/best face
-        face = faces[0]
+        return img, gray, image_quality, faces[0], scale
+
+    def _assess_face(
+        self,
+        img: np.ndarray,
+        gray: np.ndarray,
+        face: Any,
+        image_quality: dict[str, Any],
+        min_quality: FaceQuality,
+        check_liveness: bool,
+    ) -> tuple[int, dict[str, Any]]:
+        """
+        Run liveness detection and enforce the minimum face quality.
 
-        # Get face bounding box
-        bbox = face.bbox.astype(int).tolist()
+        Returns:
+            Tuple of (quality score, liveness results)
 
-        # Liveness detection
+        Raises:
+            LowQualityFaceError: Face quality too low
+            SpoofingDetectedError: Potential spoofing detected
+        """
+        # Calculate quality score. Liveness can only lower it, so a face that
+        # already fails here is rejected without running liveness detection.
         liveness = {"liveness_check": False}
-        if check_liveness:
-            liveness = self._detect_liveness(img, bbox)
+        quality_score = self._calculate_face_quality_score(
+            face, image_quality, liveness
+        )
+
+        if quality_score >= min_quality.value and check_liveness:
+            # Liveness detection
+            liveness = self._detect_liveness(img, face.bbox.astype(int).tolist(), gray)
             if liveness.get("liveness_check") and not liveness.get("is_live", True):
                 if liveness.get("risk_level") == "high":
                     raise SpoofingDetectedError(
                         "Potential spoofing detected: high risk"
                     )
-
-        # Calculate quality score
-        quality_score = self._calculate_face_quality_score(
-            face, image_quality, liveness
-        )
+                quality_score = self._calculate_face_quality_score(
+                    face, image_quality, liveness
+                )
 
         if quality_score < min_quality.value:
             raise LowQualityFaceError(
                 f"Face quality too low: {quality_score} < {min_quality.value}"
             )
 
-        # Extract face embedding
-        embedding = face.normed_embedding.tolist()
+        return quality_score, liveness
+
+    def _build_detection_result(
+        self,
+        face: Any,
+        image_quality: dict[str, Any],
+        quality_score: int,
+        liveness: dict[str, Any],
+        scale: float = 1.0,
+    ) -> dict[str, Any]:
+        """
+        Assemble the detection result dictionary for a processed face.
+
+        Geometry detected on a downscaled image is mapped back to the uploaded
+        image's coordinates with `scale`.
+        """
+        # Extract face embedding (L2-normalized float32, kept as an array)
+        embedding = _to_np(face.normed_embedding)
+        landmarks = getattr(face, "landmark_2d_106", None)
 
         return {
             "success": True,
             "face_detected": True,
             "quality_score": quality_score,
             "detection_confidence": float(face.det_score),
-            "bbox": bbox,
+            "bbox": (face.bbox / scale).astype(int).tolist(),
             "embedding": embedding,
-            "embedding_size": len(embedding),
+            "embedding_size": embedding.shape[0],
             "image_quality": image_quality,
             "liveness": liveness,
-            "landmarks": face.landmark_2d_106.tolist()
-            if hasattr(face, "landmark_2d_106")
-            else None,
-            "pose": face.pose.tolist()
+            # Arrays, not lists: ORJSONResponse serializes numpy natively
+            "landmarks": landmarks / scale if landmarks is not None else None,
+            "pose": face.pose
             if hasattr(face, "pose") and face.pose is not None
             else None,
             "age": int(face.age)
@@ -422,10 +809,100 @@ class FaceRecognitionService:
             "gender": face.gender if hasattr(face, "gender") else None,
         }
 
+    def detect_face(
+        self,
+        image: Any,
+        min_quality: FaceQuality = FaceQuality.ACCEPTABLE,
+        check_liveness: bool = True,
+        allow_multiple_faces: bool = False,
+    ) -> dict[str, Any]:
+        """
+        Detect face in image and extract information.
+
+        Args:
+            image: Input image (various formats supported)
+            min_quality: Minimum required face quality
+            check_liveness: Perform liveness detection
+            allow_multiple_faces: Allow multiple faces in image
+
+        Returns:
+            Dictionary with face detection results (embedding, landmarks
+            and pose are numpy arrays)
+
+        Raises:
+            NoFaceDetectedError: No face found
+            MultipleFacesError: Multiple faces found when not allowed
+            LowQualityFaceError: Face quality too low
+            SpoofingDetectedError: Potential spoofing detected
+        """
+        img, gray, image_quality, face, scale = self._detect_single_face(
+            image, allow_multiple_faces
+        )
+        quality_score, liveness = self._assess_face(
+            img, gray, face, image_quality, min_quality, check_liveness
+        )
+        return self._build_detection_result(
+            face, image_quality, quality_score, liveness, scale
+        )
+
+    def detect_faces_batch(
+        self,
+        images: list[Any],
+        min_quality: FaceQuality = FaceQuality.ACCEPTABLE,
+        check_liveness: bool = True,
+        allow_multiple_faces: bool = False,
+    ) -> list[dict[str, Any] | Exception]:
+        """
+        Detect faces in several images, batching the embedding computation.
+
+        Detection, quality and liveness checks run per image; the recognition
+        model then runs once over all faces that passed them, which amortizes
+        the per-call inference overhead.
+
+        Args:
+            images: Input images (various formats supported)
+            min_quality: Minimum required face quality
+            check_liveness: Perform liveness detection
+            allow_multiple_faces: Allow multiple faces in image
+
+        Returns:
+            One entry per input image, in order: the same dictionary
+            `detect_face` returns, or the exception raised for that image
+        """
+        results: list[dict[str, Any] | Exception] = []
+        accepted = []
+
+        for image in images:
+            try:
+                img, gray, image_quality, face, scale = self._detect_single_face(
+                    image, allow_multiple_faces, with_embedding=False
+                )
+                quality_score, liveness = self._assess_face(
+                    img, gray, face, image_quality, min_quality, check_liveness
+                )
+            except (FaceRecognitionError, ValueError) as e:
+                results.append(e)
+                continue
+
+            accepted.append(
+                (len(results), img, face, image_quality, quality_score, liveness, scale)
+            )
+            results.append(None)
+
+        if accepted:
+            self._embed_faces([(img, face) for _, img, face, *_ in accepted])
+
+        for index, _, face, image_quality, quality_score, liveness, scale in accepted:
+            results[index] = self._build_detection_result(
+                face, image_quality, quality_score, liveness, scale
+            )
+
+        return results
+
     def compare_faces(
         self,
-        embedding1: list[float],
-        embedding2: list[float],
+        embedding1: np.ndarray | list[float],
+        embedding2: np.ndarray | list[float],
         security_level: SecurityLevel = SecurityLevel.MEDIUM,
     ) -> dict[str, Any]:
         """
@@ -439,20 +916,30 @@ class FaceRecognitionService:
         Returns:
             Dictionary with comparison results
         """
+        a = _to_np(embedding1)
+        b = _to_np(embedding2)
+
         # Validate embeddings
-        if len(embedding1) != len(embedding2):
-            raise ValueError(
-                f"Embedding size mismatch: {len(embedding1)} != {len(embedding2)}"
-            )
+        if a.shape != b.shape:
+            raise ValueError(f"Embedding size mismatch: {len(a)} != {len(b)}")
 
         # Calculate cosine similarity
-        similarity = 1 - cosine(embedding1, embedding2)
+        similarity = float(a @ b) / (
+            float(np.linalg.norm(a) * np.linalg.norm(b)) + _NORM_EPS
+        )
 
         # Calculate Euclidean distance
-        euclidean_dist = float(
-            np.linalg.norm(np.array(embedding1) - np.array(embedding2))
-        )
+        euclidean_dist = float(np.linalg.norm(a - b))
 
+        return {
+            **self._score_similarity(similarity, security_level),
+            "euclidean_distance": euclidean_dist,
+        }
+
+    def _score_similarity(
+        self, similarity: float, security_level: SecurityLevel
+    ) -> dict[str, Any]:
+        """Turn a cosine similarity into a match decision and confidence."""
         # Determine if match based on security level
         threshold = security_level.value
         is_match = similarity > (1 - threshold)
@@ -463,7 +950,6 @@ class FaceRecognitionService:
         return {
             "is_match": is_match,
             "similarity": float(similarity),
-            "euclidean_distance": euclidean_dist,
             "threshold": threshold,
             "confidence": float(confidence),
             "security_level": security_level.name,
@@ -472,7 +958,7 @@ class FaceRecognitionService:
     def verify_face(
         self,
         image: Any,
-        reference_embedding: list[float],
+        reference_embedding: np.ndarray | list[float],
         security_level: SecurityLevel = SecurityLevel.MEDIUM,
         min_quality: FaceQuality = FaceQuality.ACCEPTABLE,
         check_liveness: bool = True,
@@ -506,6 +992,25 @@ class FaceRecognitionService:
             allow_multiple_faces=False,
         )
 
+        return self.verify_detection(detection, reference_embedding, security_level)
+
+    def verify_detection(
+        self,
+        detection: dict[str, Any],
+        reference_embedding: np.ndarray | list[float],
+        security_level: SecurityLevel = SecurityLevel.MEDIUM,
+    ) -> dict[str, Any]:
+        """
+        Verify an existing detection result against a reference embedding.
+
+        Args:
+            detection: Result of `detect_face` / `detect_faces_batch`
+            reference_embedding: Reference face embedding to compare against
+            security_level: Security level for matching
+
+        Returns:
+            Dictionary with verification results (same as `verify_face`)
+        """
         # Compare with reference
         comparison = self.compare_faces(
             detection["embedding"],
@@ -513,7 +1018,38 @@ class FaceRecognitionService:
             security_level=security_level,
         )
 
-        # Combine results
+        return self._build_verification_result(detection, comparison, security_level)
+
+    def verify_detection_similarity(
+        self,
+        detection: dict[str, Any],
+        similarity: float,
+        security_level: SecurityLevel = SecurityLevel.MEDIUM,
+    ) -> dict[str, Any]:
+        """
+        Verify an existing detection result given an already computed similarity.
+
+        Used when the cosine similarity against the reference embedding was
+        computed elsewhere (e.g. by pgvector inside the database).
+
+        Args:
+            detection: Result of `detect_face` / `detect_faces_batch`
+            similarity: Cosine similarity between detection and reference
+            security_level: Security level for matching
+
+        Returns:
+            Dictionary with verification results (same as `verify_face`)
+        """
+        comparison = self._score_similarity(similarity, security_level)
+        return self._build_verification_result(detection, comparison, security_level)
+
+    def _build_verification_result(
+        self,
+        detection: dict[str, Any],
+        comparison: dict[str, Any],
+        security_level: SecurityLevel,
+    ) -> dict[str, Any]:
+        """Combine a detection result and a comparison into a verification."""
         return {
             "verified": comparison["is_match"],
             "quality_score": detection["quality_score"],
@@ -530,7 +1066,7 @@ class FaceRecognitionService:
         image: Any,
         min_quality: FaceQuality = FaceQuality.GOOD,
         check_liveness: bool = True,
-    ) -> list[float]:
+    ) -> np.ndarray:
         """
         Extract face embedding from image (convenience method).
 
@@ -540,7 +1076,7 @@ class FaceRecognitionService:
             check_liveness: Perform liveness detection
 
         Returns:
-            Face embedding as list of floats
+            Face embedding as a float32 array
 
         Raises:
             NoFaceDetectedError: No face found
@@ -558,8 +1094,9 @@ class FaceRecognitionService:
 
     def batch_compare(
         self,
-        query_embedding: list[float],
-        embeddings_database: list[tuple[str, list[float]]],
+        query_embedding: np.ndarray | list[float],
+        embeddings_database: EmbeddingIndex
+        | list[tuple[str, np.ndarray | list[float]]],
         security_level: SecurityLevel = SecurityLevel.MEDIUM,
         top_k: int = 5,
     ) -> list[dict[str, Any]]:
@@ -568,48 +1105,67 @@ class FaceRecognitionService:
 
         Args:
             query_embedding: Query face embedding
-            embeddings_database: List of (id, embedding) tuples
+            embeddings_database: EmbeddingIndex, or list of (id, embedding)
+                tuples (converted to an index on every call)
             security_level: Security level for matching
             top_k: Return top K matches
 
         Returns:
             List of top matches sorted by similarity
         """
-        results = []
+        top_k = min(top_k, len(embeddings_database))
+        if top_k <= 0:
+            return []
 
-        for face_id, embedding in embeddings_database:
-            comparison = self.compare_faces(
-                query_embedding,
-                embedding,
-                security_level=security_level,
-            )
-            results.append(
-                {
-                    "id": face_id,
-                    **comparison,
-                }
+        query = _to_np(query_embedding)
+        if isinstance(embeddings_database, EmbeddingIndex):
+            index = embeddings_database
+        else:
+            index = EmbeddingIndex.from_pairs(embeddings_database, dim=query.shape[0])
+        if index.dim != query.shape[0]:
+            raise ValueError(
+                f"Embedding size mismatch: {index.dim} != {query.shape[0]}"
             )
 
-        # Sort by similarity and return top K
-        results.sort(key=lambda x: x["similarity"], reverse=True)
-        return results[:top_k]
+        # Score the whole database with a single matrix-vector product
+        matrix = index.matrix
+        similarities = (matrix @ query) / (
+            index.norms * np.linalg.norm(query) + _NORM_EPS
+        )
+
+        # Select the top K without sorting the whole database
+        top = np.argpartition(-similarities, top_k - 1)[:top_k]
+        top = top[np.argsort(-similarities[top], kind="stable")]
+        euclidean_dists = np.linalg.norm(matrix[top] - query, axis=1)
+
+        return [
+            {
+                "id": index.ids[i],
+                **self._score_similarity(float(similarities[i]), security_level),
+                "euclidean_distance": float(distance),
+            }
+            for i, distance in zip(top, euclidean_dists, strict=True)
+        ]
 
     def __del__(self):
         """Cleanup resources."""
-        if hasattr(self, "mp_face_detection"):
-            self.mp_face_detection.close()
-        if hasattr(self, "mp_face_mesh"):
-            self.mp_face_mesh.close()
+        # Only close what was actually loaded (hasattr would load it)
+        for name in ("mp_face_detection", "mp_face_mesh"):
+            model = self.__dict__.get(name)
+            if model is not None:
+                model.close()
 
 
 # Convenience function to create a singleton instance
 _default_service: FaceRecognitionService | None = None
+_default_service_lock = threading.Lock()
 
 
 def get_face_recognition_service(
     model_name: str = "buffalo_l",
     providers: list[str] | None = None,
     use_mediapipe: bool = True,
+    use_opencl: bool = False,
     force_new: bool = False,
 ) -> FaceRecognitionService:
     """
@@ -619,6 +1175,7 @@ def get_face_recognition_service(
         model_name: InsightFace model name
         providers: ONNX Runtime providers
         use_mediapipe: Enable MediaPipe validation
+        use_opencl: Run full-image OpenCV passes on OpenCL when available
         force_new: Force creation of new instance
 
     Returns:
@@ -626,11 +1183,18 @@ def get_face_recognition_service(
     """
     global _default_service
 
-    if _default_service is None or force_new:
-        _default_service = FaceRecognitionService(
-            model_name=model_name,
-            providers=providers,
-            use_mediapipe=use_mediapipe,
-        )
+    if _default_service is not None and not force_new:
+        return _default_service
+
+    # Concurrent first calls (e.g. startup preload racing a request) must not
+    # build two services
+    with _default_service_lock:
+        if _default_service is None or force_new:
+            _default_service = FaceRecognitionService(
+                model_name=model_name,
+                providers=providers,
+                use_mediapipe=use_mediapipe,
+                use_opencl=use_opencl,
+            )
 
     return _default_service
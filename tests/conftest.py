@@ -1,69 +1,150 @@
+import asyncio
+import inspect
+import os
+import sys
 from collections.abc import AsyncGenerator
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 import pytest_asyncio
+from argon2 import PasswordHasher
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import make_url, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 
 from app.core.config import settings
 from app.db.database import Base, get_db
 from app.main import app
+from app.modules.auth import service as auth_service_module
+from app.modules.auth.service import AuthService
+from app.modules.auth.throttle import login_throttle
+from app.modules.auth.token_cache import token_cache
+from app.modules.user.cache import user_cache
+from app.modules.user.schemas import UserCreate
+from app.modules.user.service import UserService
+
+# Use test database; each pytest-xdist worker (gw0, gw1, ...) gets its own
+TEST_DATABASE_URL = make_url(settings.DATABASE_TEST_URL)
+if _xdist_worker := os.environ.get("PYTEST_XDIST_WORKER"):
+    TEST_DATABASE_URL = TEST_DATABASE_URL.set(
+        database=f"{TEST_DATABASE_URL.database}_{_xdist_worker}"
+    )
+
+
+def _loop_factories() -> dict:
+    # uvicorn[standard] doesn't install uvloop on Windows; keep the default
+    if sys.platform == "win32":
+        return {"asyncio": asyncio.new_event_loop}
+
+    import uvloop
+
+    return {"uvloop": uvloop.new_event_loop}
 
-# Use test database
-TEST_DATABASE_URL = settings.DATABASE_TEST_URL
 
+LOOP_FACTORIES = _loop_factories()
 
-@pytest.fixture
-def event_loop():
-    """Create an instance of the default event loop for each test."""
-    import asyncio
 
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    yield loop
-    loop.close()
+def pytest_asyncio_loop_factories(config, item):
+    """Run the tests on uvloop, the loop uvicorn[standard] serves the app with"""
+    return LOOP_FACTORIES
+
+
+def pytest_generate_tests(metafunc):
+    """Give sync tests (the benchmarks) the same loop factory as async ones"""
+    # pytest-asyncio only parametrizes async tests with the hook's factories. A
+    # sync test using async fixtures would otherwise get the default loop, and
+    # the session loop (with the engine on it) would be torn down and rebuilt.
+    if inspect.iscoroutinefunction(metafunc.function):
+        return
+    metafunc.fixturenames.append("_asyncio_loop_factory")
+    metafunc.parametrize(
+        "_asyncio_loop_factory",
+        list(LOOP_FACTORIES.values()),
+        ids=[pytest.HIDDEN_PARAM],
+        indirect=True,
+        scope="session",
+    )
 
 
 @pytest_asyncio.fixture(scope="session", autouse=True)
 async def setup_test_database():
     """Create test database if it doesn't exist"""
-    default_db_url = TEST_DATABASE_URL.rsplit("/", 1)[0] + "/postgres"
+    default_db_url = TEST_DATABASE_URL.set(database="postgres")
     engine = create_async_engine(default_db_url, isolation_level="AUTOCOMMIT")
+    database = TEST_DATABASE_URL.database
 
     async with engine.connect() as conn:
         result = await conn.execute(
-            text("SELECT 1 FROM pg_database WHERE datname='face_recognition_test'")
+            text("SELECT 1 FROM pg_database WHERE datname = :name"),
+            {"name": database},
         )
         exists = result.scalar()
 
         if not exists:
-            await conn.execute(text("CREATE DATABASE face_recognition_test"))
+            await conn.execute(text(f'CREATE DATABASE "{database}"'))
 
     await engine.dispose()
 
 
-@pytest_asyncio.fixture(scope="function")
-async def db_session() -> AsyncGenerator[AsyncSession, None]:
-    """Create a fresh database session for each test"""
-    # Create engine per test to avoid event loop issues
+@pytest.fixture(scope="session", autouse=True)
+def fast_password_hashing():
+    """
+    Hash test passwords with the minimum Argon2 cost.
+
+    The hashes are still valid Argon2id, so verification is unchanged. Worker
+    processes start fresh (forkserver) and wouldn't see the patch, so the
+    password "pool" runs in threads of this process during the tests.
+    """
+    auth_service_module.shutdown_password_pool()
+    auth_service_module._dummy_hash.cache_clear()
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(
+            auth_service_module,
+            "_PASSWORD_HASHER",
+            PasswordHasher(time_cost=1, memory_cost=8, parallelism=1),
+        )
+        mp.setattr(
+            auth_service_module,
+            "_password_pool",
+            ThreadPoolExecutor(thread_name_prefix="password"),
+        )
+        yield
+        auth_service_module.shutdown_password_pool()
+        auth_service_module._dummy_hash.cache_clear()
+
+
+@pytest.fixture(scope="session")
+def auth_service(fast_password_hashing) -> AuthService:
+    """AuthService shared by the tests (hashes with the test cost)"""
+    return AuthService()
+
+
+@pytest.fixture(autouse=True)
+def clear_auth_caches():
+    """Don't let cached tokens/users leak between tests (the DB is rolled back)"""
+    yield
+    token_cache.clear()
+    user_cache.clear()
+    login_throttle.clear()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def engine(setup_test_database) -> AsyncGenerator[AsyncEngine, None]:
+    """Create the test engine and schema once for the whole session"""
+    # Same compiled-statement cache as the app engine, kept warm all session
     engine = create_async_engine(
         TEST_DATABASE_URL,
         echo=False,
         pool_pre_ping=True,
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
     )
 
     async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
 
-    session_maker = async_sessionmaker(
-        engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-    )
-
-    async with session_maker() as session:
-        yield session
+    yield engine
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
@@ -72,16 +153,63 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
 
 
 @pytest_asyncio.fixture(scope="function")
-async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
-    """Create a test client with overridden database dependency"""
+async def db_session(engine: AsyncEngine) -> AsyncGenerator[AsyncSession, None]:
+    """Database session whose changes are rolled back after each test"""
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        # Commits made by the code under test only release a savepoint; the
+        # outer transaction is rolled back at teardown
+        session = AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
 
-    async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
-        yield db_session
+        try:
+            yield session
+        finally:
+            await session.close()
+            await transaction.rollback()
 
-    app.dependency_overrides[get_db] = override_get_db
 
+@pytest_asyncio.fixture(scope="session")
+async def http_client() -> AsyncGenerator[AsyncClient, None]:
+    """One HTTP client (and ASGI transport) shared by the whole session"""
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as test_client:
         yield test_client
 
+
+@pytest_asyncio.fixture(scope="function")
+async def client(
+    http_client: AsyncClient, db_session: AsyncSession
+) -> AsyncGenerator[AsyncClient, None]:
+    """Shared test client with the database dependency bound to this test"""
+
+    async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
+        yield db_session
+
+    app.dependency_overrides[get_db] = override_get_db
+
+    yield http_client
+
     app.dependency_overrides.clear()
+    http_client.cookies.clear()
+
+
+@pytest_asyncio.fixture(scope="function")
+async def admin_headers(
+    db_session: AsyncSession, auth_service: AuthService
+) -> dict[str, str]:
+    """Bearer token of a superuser (the user endpoints are admin only)"""
+    admin = UserCreate(
+        email="admin@example.com",
+        name="Admin",
+        password="adminpassword",
+        is_superuser=True,
+    )
+    await UserService(db_session).create(
+        admin, auth_service.get_password_hash(admin.password)
+    )
+    token = auth_service.create_access_token(data={"sub": admin.email})
+    return {"Authorization": f"Bearer {token}"}
@@ -1,18 +1,21 @@
+import bcrypt
 import pytest
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.modules.auth.service import AuthService
 from app.modules.user.schemas import UserCreate
 from app.modules.user.service import UserService
 
 
 @pytest.mark.asyncio
-async def test_login_success(client: AsyncClient, db_session: AsyncSession):
+async def test_login_success(
+    client: AsyncClient, db_session: AsyncSession, auth_service: AuthService
+):
     """Test successful login"""
     # Create user
     user_service = UserService(db_session)
-    auth_service = AuthService()
     user = UserCreate(
         email="login@example.com", name="Login User", password="testpassword"
     )
@@ -30,11 +33,37 @@ async def test_login_success(client: AsyncClient, db_session: AsyncSession):
 
 
 @pytest.mark.asyncio
-async def test_login_wrong_password(client: AsyncClient, db_session: AsyncSession):
+async def test_login_rehashes_bcrypt_password(
+    client: AsyncClient, db_session: AsyncSession, auth_service: AuthService
+):
+    """Test that a login with a legacy bcrypt hash upgrades it to Argon2id"""
+    user_service = UserService(db_session)
+    user = UserCreate(
+        email="bcrypt@example.com", name="Bcrypt User", password="legacypassword"
+    )
+    bcrypt_hash = bcrypt.hashpw(user.password.encode(), bcrypt.gensalt(rounds=4))
+    await user_service.create(user, bcrypt_hash.decode())
+
+    response = await client.post(
+        "/api/v1/auth/login",
+        json={"email": "bcrypt@example.com", "password": "legacypassword"},
+    )
+    assert response.status_code == 200
+
+    auth_user = await user_service.get_auth_user_by_email("bcrypt@example.com")
+    assert auth_user.hashed_password.startswith("$argon2id$")
+    assert await auth_service.verify_password(
+        "legacypassword", auth_user.hashed_password
+    )
+
+
+@pytest.mark.asyncio
+async def test_login_wrong_password(
+    client: AsyncClient, db_session: AsyncSession, auth_service: AuthService
+):
     """Test login with wrong password"""
     # Create user
     user_service = UserService(db_session)
-    auth_service = AuthService()
     user = UserCreate(
         email="wrongpass@example.com", name="User", password="correctpassword"
     )
@@ -61,11 +90,25 @@ async def test_login_nonexistent_user(client: AsyncClient):
 
 
 @pytest.mark.asyncio
-async def test_get_current_user(client: AsyncClient, db_session: AsyncSession):
+async def test_login_throttled_after_repeated_failures(client: AsyncClient):
+    """Test that repeated failed logins are rejected with 429"""
+    credentials = {"email": "bruteforce@example.com", "password": "guess"}
+    for _ in range(settings.LOGIN_THROTTLE_CAPACITY):
+        response = await client.post("/api/v1/auth/login", json=credentials)
+        assert response.status_code == 401
+
+    response = await client.post("/api/v1/auth/login", json=credentials)
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+
+
+@pytest.mark.asyncio
+async def test_get_current_user(
+    client: AsyncClient, db_session: AsyncSession, auth_service: AuthService
+):
     """Test getting current user info"""
     # Create user
     user_service = UserService(db_session)
-    auth_service = AuthService()
     user = UserCreate(
         email="current@example.com", name="Current User", password="testpassword"
     )
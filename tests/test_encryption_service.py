@@ -0,0 +1,137 @@
+import base64
+import json
+
+import numpy as np
+import pytest
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet
+
+from app.services.encryption_service import EncryptionService
+
+KEY = EncryptionService.generate_key()
+
+
+@pytest.fixture
+def embedding() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    values = rng.standard_normal(512).astype(np.float32)
+    return values / np.linalg.norm(values)
+
+
+def cosine(a: np.ndarray, b: np.ndarray) -> float:
+    return float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+def test_int8_round_trip(embedding: np.ndarray):
+    """Test that a quantized (int8) embedding keeps its direction"""
+    service = EncryptionService(KEY)
+
+    decrypted = service.decrypt_embedding(service.encrypt_embedding(embedding))
+    assert decrypted.dtype == np.float32
+    assert decrypted.shape == embedding.shape
+    assert cosine(decrypted, embedding) > 0.9999
+
+
+def test_float32_round_trip(embedding: np.ndarray):
+    """Test that a full-precision embedding decrypts back exactly"""
+    service = EncryptionService(KEY, quantize=False)
+
+    decrypted = service.decrypt_embedding(service.encrypt_embedding(embedding))
+    assert decrypted.dtype == np.float32
+    np.testing.assert_array_equal(decrypted, embedding)
+
+
+def test_legacy_json_rows(embedding: np.ndarray):
+    """Test that rows stored as an encrypted JSON list still decrypt"""
+    service = EncryptionService(KEY)
+    token = Fernet(KEY.encode()).encrypt(json.dumps(embedding.tolist()).encode())
+
+    np.testing.assert_allclose(service.decrypt_embedding(token.decode()), embedding)
+
+
+def test_legacy_base64_wrapped_rows(embedding: np.ndarray):
+    """Test that Fernet tokens wrapped in another base64 layer still decrypt"""
+    service = EncryptionService(KEY)
+    token = Fernet(KEY.encode()).encrypt(json.dumps(embedding.tolist()).encode())
+    wrapped = base64.b64encode(token).decode()
+
+    np.testing.assert_allclose(service.decrypt_embedding(wrapped), embedding)
+
+
+def test_aes_gcm_round_trip(embedding: np.ndarray):
+    """Test that an AES-GCM token decrypts back to the embedding"""
+    service = EncryptionService(KEY, use_aes_gcm=True)
+
+    token = service.encrypt_embedding(embedding)
+    assert token.startswith("gcm1:")
+    assert cosine(service.decrypt_embedding(token), embedding) > 0.9999
+
+
+def test_aes_gcm_tampered_token_fails(embedding: np.ndarray):
+    """Test that a modified AES-GCM token fails authentication"""
+    service = EncryptionService(KEY, use_aes_gcm=True, cache_size=0)
+    token = service.encrypt_embedding(embedding)
+
+    # Flip one character of the ciphertext (after prefix and nonce)
+    position = len("gcm1:") + 30
+    flipped = "A" if token[position] != "A" else "B"
+    tampered = token[:position] + flipped + token[position + 1 :]
+
+    with pytest.raises(InvalidTag):
+        service.decrypt_embedding(tampered)
+
+
+def test_aes_gcm_reads_either_format(embedding: np.ndarray):
+    """Test that Fernet and AES-GCM rows decrypt whatever the flag is set to"""
+    fernet_service = EncryptionService(KEY)
+    gcm_service = EncryptionService(KEY, use_aes_gcm=True)
+    fernet_token = fernet_service.encrypt_embedding(embedding)
+    gcm_token = gcm_service.encrypt_embedding(embedding)
+
+    assert cosine(gcm_service.decrypt_embedding(fernet_token), embedding) > 0.9999
+    assert cosine(fernet_service.decrypt_embedding(gcm_token), embedding) > 0.9999
+
+
+def test_aes_gcm_key_derived_lazily(embedding: np.ndarray):
+    """Test that Fernet-only use never derives the AES-GCM key"""
+    service = EncryptionService(KEY)
+    service.decrypt_embedding(service.encrypt_embedding(embedding))
+
+    assert "aead" not in service.__dict__
+
+
+def test_decrypt_cache_hit(embedding: np.ndarray, monkeypatch: pytest.MonkeyPatch):
+    """Test that decrypting the same token twice reuses the cached array"""
+    service = EncryptionService(KEY)
+    token = service.encrypt_embedding(embedding)
+    calls = []
+    decrypt = service._decrypt
+
+    def counting_decrypt(encrypted_embedding: str) -> np.ndarray:
+        calls.append(encrypted_embedding)
+        return decrypt(encrypted_embedding)
+
+    monkeypatch.setattr(service, "_decrypt", counting_decrypt)
+
+    first = service.decrypt_embedding(token)
+    assert service.decrypt_embedding(token) is first
+    assert calls == [token]
+
+
+def test_decrypt_cache_returns_read_only(embedding: np.ndarray):
+    """Test that a cached embedding can't be modified by a caller"""
+    service = EncryptionService(KEY)
+    decrypted = service.decrypt_embedding(service.encrypt_embedding(embedding))
+
+    with pytest.raises(ValueError, match="read-only"):
+        decrypted[0] = 1.0
+
+
+def test_decrypt_cache_disabled(embedding: np.ndarray):
+    """Test that cache_size=0 decrypts every time and caches nothing"""
+    service = EncryptionService(KEY, cache_size=0)
+    token = service.encrypt_embedding(embedding)
+
+    first = service.decrypt_embedding(token)
+    assert service.decrypt_embedding(token) is not first
+    assert len(service._decrypted) == 0
@@ -0,0 +1,142 @@
+import numpy as np
+import pytest
+from insightface.app.common import Face
+
+from app.services import face_recognition_service
+from app.services.face_recognition_service import (
+    EmbeddingIndex,
+    FaceRecognitionService,
+)
+
+
+@pytest.fixture
+def face_service() -> FaceRecognitionService:
+    """Service without loaded models (comparisons don't use them)"""
+    return FaceRecognitionService.__new__(FaceRecognitionService)
+
+
+def test_compare_faces_zero_embedding(face_service: FaceRecognitionService):
+    """Test that a zeroed embedding doesn't match instead of failing"""
+    zero = np.zeros(512, dtype=np.float32)
+    embedding = np.ones(512, dtype=np.float32)
+
+    result = face_service.compare_faces(zero, embedding)
+    assert result["similarity"] == 0.0
+    assert result["is_match"] is False
+
+
+def test_batch_compare_zero_embedding(face_service: FaceRecognitionService):
+    """Test that zeroed embeddings score 0 similarity in a batch comparison"""
+    zero = np.zeros(512, dtype=np.float32)
+    embedding = np.ones(512, dtype=np.float32)
+    index = EmbeddingIndex.from_pairs([("zero", zero), ("ones", embedding)])
+
+    results = face_service.batch_compare(zero, index)
+    assert [result["similarity"] for result in results] == [0.0, 0.0]
+    assert not any(result["is_match"] for result in results)
+
+
+def test_detection_geometry_in_uploaded_coordinates(
+    face_service: FaceRecognitionService,
+):
+    """Test that geometry found on a downscaled image maps back to the upload"""
+    face_service.max_image_side = 400
+    img, scale = face_service._load_image(np.zeros((1600, 800, 3), dtype=np.uint8))
+    assert img.shape[:2] == (400, 200)
+    assert scale == 0.25
+
+    face = Face(bbox=np.array([10, 20, 30, 40], dtype=np.float32), det_score=0.9)
+    face.embedding = np.ones(512, dtype=np.float32)
+    face.landmark_2d_106 = np.full((106, 2), 10, dtype=np.float32)
+
+    result = face_service._build_detection_result(face, {}, 80, {}, scale)
+    assert result["bbox"] == [40, 80, 120, 160]
+    assert np.allclose(result["landmarks"], 40)
+    quality = face_service._check_image_quality(img, scale=scale)
+    assert quality["resolution"] == (800, 1600)
+
+
+def test_fast_verify_runs_liveness(monkeypatch: pytest.MonkeyPatch):
+    """Test that the fast_verify preset keeps liveness detection on"""
+    monkeypatch.setattr(face_recognition_service, "_get_face_app", lambda *args: None)
+    service = FaceRecognitionService.fast_verify(providers=["CPUExecutionProvider"])
+
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, (120, 120, 3), dtype=np.uint8)
+
+    liveness = service._detect_liveness(img, [10, 10, 110, 110])
+    assert liveness["liveness_check"] is True
+    assert "is_live" in liveness
+
+
+def _unit(*values: float) -> np.ndarray:
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_embedding_index_replaces_duplicate_id():
+    """Test that adding an existing id replaces its embedding"""
+    index = EmbeddingIndex(dim=3)
+    index.add("a", _unit(1, 0, 0))
+    index.add("b", _unit(0, 1, 0))
+    index.add("a", _unit(0, 0, 1))
+
+    assert len(index) == 2
+    assert index.ids == ["a", "b"]
+    np.testing.assert_array_equal(index.matrix[0], _unit(0, 0, 1))
+
+    pairs = [("a", _unit(1, 0, 0)), ("a", _unit(0, 0, 1))]
+    index = EmbeddingIndex.from_pairs(pairs, dim=3)
+    assert index.ids == ["a"]
+    np.testing.assert_array_equal(index.matrix[0], _unit(0, 0, 1))
+
+
+def test_embedding_index_remove_then_query(face_service: FaceRecognitionService):
+    """Test that removal (last row moved into the gap) keeps ids and rows aligned"""
+    index = EmbeddingIndex.from_pairs(
+        [("a", _unit(1, 0, 0)), ("b", _unit(0, 1, 0)), ("c", _unit(0, 0, 1))], dim=3
+    )
+
+    assert index.remove("a") is True
+    assert index.remove("a") is False
+    assert "a" not in index
+    assert index.ids == ["c", "b"]
+
+    for face_id, query in [("b", _unit(0, 1, 0)), ("c", _unit(0, 0, 1))]:
+        best = face_service.batch_compare(query, index, top_k=1)[0]
+        assert best["id"] == face_id
+        assert best["similarity"] == pytest.approx(1.0)
+
+    # The freed row is reused
+    index.add("d", _unit(1, 1, 0))
+    assert index.ids == ["c", "b", "d"]
+    assert face_service.batch_compare(_unit(1, 1, 0), index, top_k=1)[0]["id"] == "d"
+
+
+def test_embedding_index_grows_past_capacity():
+    """Test that adding beyond the preallocated rows keeps every embedding"""
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((10, 4)).astype(np.float32)
+
+    index = EmbeddingIndex(dim=4, capacity=2)
+    for i, embedding in enumerate(embeddings):
+        index.add(str(i), embedding)
+
+    assert index.ids == [str(i) for i in range(10)]
+    np.testing.assert_array_equal(index.matrix, embeddings)
+    np.testing.assert_allclose(index.norms, np.linalg.norm(embeddings, axis=1))
+
+
+def test_batch_compare_index_matches_list(face_service: FaceRecognitionService):
+    """Test that batch_compare scores an index exactly like the list input"""
+    rng = np.random.default_rng(1)
+    pairs = [(f"user{i}", rng.standard_normal(512)) for i in range(20)]
+    query = rng.standard_normal(512).astype(np.float32)
+
+    index = EmbeddingIndex(capacity=1)
+    for face_id, embedding in pairs:
+        index.add(face_id, embedding)
+
+    assert face_service.batch_compare(query, index) == face_service.batch_compare(
+        query, pairs
+    )
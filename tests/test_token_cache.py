@@ -0,0 +1,72 @@
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient
+
+from app.modules.auth import token_cache as token_cache_module
+from app.modules.auth.service import AuthService
+from app.modules.auth.token_cache import TokenCache, token_cache
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Controllable time.time for the token cache module"""
+    now = [1_000_000.0]
+    monkeypatch.setattr(
+        token_cache_module, "time", SimpleNamespace(time=lambda: now[0])
+    )
+    return now
+
+
+def test_token_expires_at_exp(clock: list[float]):
+    """Test that a token is served until its exp, then dropped"""
+    cache = TokenCache()
+    cache.set("token", "user@example.com", expires_at=clock[0] + 60)
+
+    clock[0] += 59
+    assert cache.get("token") == "user@example.com"
+
+    clock[0] += 1
+    assert cache.get("token") is None
+    assert len(cache._entries) == 0
+
+
+def test_overflow_purges_expired_before_evicting(clock: list[float]):
+    """Test that a full cache drops expired tokens before live ones"""
+    cache = TokenCache(maxsize=2)
+    cache.set("live", "live@example.com", expires_at=clock[0] + 600)
+    cache.set("expiring", "expiring@example.com", expires_at=clock[0] + 10)
+
+    clock[0] += 10
+    cache.set("new", "new@example.com", expires_at=clock[0] + 600)
+
+    # Plain LRU eviction would have dropped "live", the oldest entry
+    assert cache.get("live") == "live@example.com"
+    assert cache.get("new") == "new@example.com"
+    assert len(cache._entries) == 2
+
+
+@pytest.mark.asyncio
+async def test_invalid_token_not_cached(client: AsyncClient):
+    """Test that a token failing verification is never cached"""
+    response = await client.get(
+        "/api/v1/auth/me", headers={"Authorization": "Bearer invalid_token"}
+    )
+    assert response.status_code == 401
+    assert token_cache.get("invalid_token") is None
+    assert len(token_cache._entries) == 0
+
+
+@pytest.mark.asyncio
+async def test_expired_token_not_cached(client: AsyncClient, auth_service: AuthService):
+    """Test that an expired (but correctly signed) token is never cached"""
+    token = auth_service.create_access_token(
+        data={"sub": "expired@example.com"}, expires_delta=timedelta(minutes=-1)
+    )
+
+    response = await client.get(
+        "/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 401
+    assert len(token_cache._entries) == 0
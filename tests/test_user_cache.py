@@ -0,0 +1,127 @@
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.auth.service import AuthService
+from app.modules.user import cache as cache_module
+from app.modules.user.cache import UserCache, user_cache
+from app.modules.user.schemas import User, UserCreate, UserUpdate
+from app.modules.user.service import UserService
+from app.services.encryption_service import EncryptionService
+
+CACHED_USER = UserCreate(
+    email="cached@example.com", name="Cached User", password="pass123"
+)
+
+
+def make_user(email: str) -> User:
+    return User(
+        id=1,
+        email=email,
+        name="User",
+        is_active=True,
+        is_superuser=False,
+        created_at=datetime.now(UTC),
+    )
+
+
+class FakeFaceService:
+    """Returns a fixed detection, so enrollment runs without the models"""
+
+    def detect_face(self, image, **kwargs) -> dict:
+        return {
+            "embedding": np.ones(512, dtype=np.float32),
+            "quality_score": 90,
+            "detection_confidence": 0.99,
+            "liveness": {"liveness_check": True, "is_live": True},
+        }
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Controllable time.monotonic for the cache module"""
+    now = [1000.0]
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_cache_entry_expires_after_ttl(clock: list[float]):
+    """Test that an entry is served until its TTL passes, then dropped"""
+    cache = UserCache(ttl=30)
+    user = make_user("a@example.com")
+    cache.set(user.email, user)
+
+    clock[0] += 29
+    assert cache.get(user.email) is user
+
+    clock[0] += 1
+    assert cache.get(user.email) is None
+    assert user.email not in cache._entries
+
+
+def test_cache_evicts_least_recently_used():
+    """Test that the least recently used entry is evicted past maxsize"""
+    cache = UserCache(maxsize=2)
+    for email in ("a@example.com", "b@example.com"):
+        cache.set(email, make_user(email))
+
+    # Reading "a" makes "b" the least recently used
+    assert cache.get("a@example.com") is not None
+    cache.set("c@example.com", make_user("c@example.com"))
+
+    assert cache.get("b@example.com") is None
+    assert cache.get("a@example.com") is not None
+    assert cache.get("c@example.com") is not None
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidated_on_update(
+    db_session: AsyncSession, auth_service: AuthService
+):
+    """Test that updating a user drops its cache entry (old email included)"""
+    user_service = UserService(db_session)
+    created_user = await user_service.create(
+        CACHED_USER, auth_service.get_password_hash(CACHED_USER.password)
+    )
+    user_cache.set(created_user.email, make_user(created_user.email))
+
+    await user_service.update(created_user.id, UserUpdate(email="renamed@example.com"))
+    assert user_cache.get("cached@example.com") is None
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidated_on_delete(
+    db_session: AsyncSession, auth_service: AuthService
+):
+    """Test that deleting a user drops its cache entry"""
+    user_service = UserService(db_session)
+    created_user = await user_service.create(
+        CACHED_USER, auth_service.get_password_hash(CACHED_USER.password)
+    )
+    user_cache.set(created_user.email, make_user(created_user.email))
+
+    assert await user_service.delete(created_user.id)
+    assert user_cache.get(created_user.email) is None
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidated_on_enroll(
+    db_session: AsyncSession, auth_service: AuthService
+):
+    """Test that enrolling a face drops the cached user (face_enrolled changes)"""
+    user_service = UserService(
+        db_session,
+        FakeFaceService(),
+        EncryptionService(EncryptionService.generate_key()),
+    )
+    created_user = await user_service.create(
+        CACHED_USER, auth_service.get_password_hash(CACHED_USER.password)
+    )
+    user_cache.set(created_user.email, make_user(created_user.email))
+
+    result = await user_service.enroll_face(created_user.id, b"image")
+    assert result["success"] is True
+    assert user_cache.get(created_user.email) is None
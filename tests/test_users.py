@@ -1,23 +1,46 @@
+import orjson
 import pytest
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.modules.auth.service import AuthService
-from app.modules.user.schemas import UserCreate
+from app.modules.user.models import User
+from app.modules.user.schemas import UserCreate, UserUpdate
 from app.modules.user.service import UserService
 
+# Test inputs, validated once at import and shared by the tests
+_PASSWORD = "pass123"
+USER_1 = UserCreate(email="user1@example.com", name="User 1", password=_PASSWORD)
+USER_2 = UserCreate(email="user2@example.com", name="User 2", password=_PASSWORD)
+READ_USER = UserCreate(
+    email="testuser@example.com", name="Test User", password=_PASSWORD
+)
+UPDATE_USER = UserCreate(
+    email="update@example.com", name="Old Name", password=_PASSWORD
+)
+DELETE_USER = UserCreate(
+    email="delete@example.com", name="Delete Me", password=_PASSWORD
+)
+CREATE_BODY = {
+    "email": "test@example.com",
+    "name": "Test User",
+    "password": "testpassword123",
+}
+# Serialized once; sent twice by the duplicate test
+DUPLICATE_BODY = orjson.dumps(dict(CREATE_BODY, email="duplicate@example.com"))
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+@pytest.fixture(scope="session")
+def hashed_pass123(auth_service: AuthService) -> str:
+    """Hash of "pass123", the password shared by the service tests"""
+    return auth_service.get_password_hash(_PASSWORD)
+
 
 @pytest.mark.asyncio
 async def test_create_user(client: AsyncClient):
     """Test creating a new user"""
-    response = await client.post(
-        "/api/v1/users/",
-        json={
-            "email": "test@example.com",
-            "name": "Test User",
-            "password": "testpassword123",
-        },
-    )
+    response = await client.post("/api/v1/users/", json=CREATE_BODY)
     assert response.status_code == 201
     data = response.json()
     assert data["email"] == "test@example.com"
@@ -29,54 +52,85 @@ async def test_create_user(client: AsyncClient):
 @pytest.mark.asyncio
 async def test_create_duplicate_user(client: AsyncClient):
     """Test creating a user with duplicate email"""
-    user_data = {
-        "email": "duplicate@example.com",
-        "name": "Test User",
-        "password": "testpassword123",
-    }
-
     # Create first user
-    response = await client.post("/api/v1/users/", json=user_data)
+    response = await client.post(
+        "/api/v1/users/", content=DUPLICATE_BODY, headers=JSON_HEADERS
+    )
     assert response.status_code == 201
 
     # Try to create duplicate
-    response = await client.post("/api/v1/users/", json=user_data)
+    response = await client.post(
+        "/api/v1/users/", content=DUPLICATE_BODY, headers=JSON_HEADERS
+    )
     assert response.status_code == 400
     assert response.json()["detail"] == "Email already registered"
 
 
 @pytest.mark.asyncio
-async def test_read_users(client: AsyncClient, db_session: AsyncSession):
+async def test_read_users(db_session: AsyncSession, hashed_pass123: str):
     """Test reading users list"""
     # Create test users
     user_service = UserService(db_session)
-    auth_service = AuthService()
-    user1 = UserCreate(email="user1@example.com", name="User 1", password="pass123")
-    user2 = UserCreate(email="user2@example.com", name="User 2", password="pass123")
-    await user_service.create(user1, auth_service.get_password_hash(user1.password))
-    await user_service.create(user2, auth_service.get_password_hash(user2.password))
+    # Seeded together: one batched INSERT and a single commit
+    db_session.add_all(
+        User(**user.model_dump(exclude={"password"}), hashed_password=hashed_pass123)
+        for user in (USER_1, USER_2)
+    )
+    await db_session.commit()
+
+    users = await user_service.get_all()
+    assert len(users) == 2
+    assert users[0].email == "user1@example.com"
+    assert users[1].email == "user2@example.com"
+
+
+@pytest.mark.asyncio
+async def test_read_users_endpoint(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    admin_headers: dict,
+    hashed_pass123: str,
+):
+    """Test listing users through the API"""
+    user_service = UserService(db_session)
+    await user_service.create(USER_1, hashed_pass123)
 
-    response = await client.get("/api/v1/users/")
+    response = await client.get("/api/v1/users/", headers=admin_headers)
     assert response.status_code == 200
     data = response.json()
-    assert len(data) == 2
-    assert data[0]["email"] == "user1@example.com"
-    assert data[1]["email"] == "user2@example.com"
+    assert sorted(user["email"] for user in data) == [
+        "admin@example.com",
+        "user1@example.com",
+    ]
+    assert all("hashed_password" not in user for user in data)
 
 
 @pytest.mark.asyncio
-async def test_read_user_by_id(client: AsyncClient, db_session: AsyncSession):
+async def test_read_user_by_id(db_session: AsyncSession, hashed_pass123: str):
     """Test reading a specific user"""
     user_service = UserService(db_session)
-    auth_service = AuthService()
-    user = UserCreate(
-        email="testuser@example.com", name="Test User", password="pass123"
-    )
-    created_user = await user_service.create(
-        user, auth_service.get_password_hash(user.password)
-    )
+    created_user = await user_service.create(READ_USER, hashed_pass123)
+
+    db_user = await user_service.get_by_id(created_user.id)
+    assert db_user is not None
+    assert db_user.email == "testuser@example.com"
+    assert db_user.id == created_user.id
+
+
+@pytest.mark.asyncio
+async def test_read_user_by_id_endpoint(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    admin_headers: dict,
+    hashed_pass123: str,
+):
+    """Test reading a specific user through the API"""
+    user_service = UserService(db_session)
+    created_user = await user_service.create(READ_USER, hashed_pass123)
 
-    response = await client.get(f"/api/v1/users/{created_user.id}")
+    response = await client.get(
+        f"/api/v1/users/{created_user.id}", headers=admin_headers
+    )
     assert response.status_code == 200
     data = response.json()
     assert data["email"] == "testuser@example.com"
@@ -84,59 +138,88 @@ async def test_read_user_by_id(client: AsyncClient, db_session: AsyncSession):
 
 
 @pytest.mark.asyncio
-async def test_read_user_not_found(client: AsyncClient):
-    """Test reading a non-existent user"""
-    response = await client.get("/api/v1/users/999")
+@pytest.mark.parametrize(
+    ("method", "kwargs"),
+    [("get", {}), ("put", {"json": {"name": "New Name"}}), ("delete", {})],
+)
+async def test_user_not_found(
+    client: AsyncClient, admin_headers: dict, method: str, kwargs: dict
+):
+    """Test reading, updating and deleting a non-existent user"""
+    response = await getattr(client, method)(
+        "/api/v1/users/999", headers=admin_headers, **kwargs
+    )
     assert response.status_code == 404
     assert response.json()["detail"] == "User not found"
 
 
 @pytest.mark.asyncio
-async def test_update_user(client: AsyncClient, db_session: AsyncSession):
+async def test_update_user(db_session: AsyncSession, hashed_pass123: str):
     """Test updating a user"""
     user_service = UserService(db_session)
-    auth_service = AuthService()
-    user = UserCreate(email="update@example.com", name="Old Name", password="pass123")
-    created_user = await user_service.create(
-        user, auth_service.get_password_hash(user.password)
+    created_user = await user_service.create(UPDATE_USER, hashed_pass123)
+
+    updated_user = await user_service.update(
+        created_user.id, UserUpdate(name="New Name")
     )
+    assert updated_user is not None
+    assert updated_user.name == "New Name"
+    assert updated_user.email == "update@example.com"
+
+
+@pytest.mark.asyncio
+async def test_update_user_endpoint(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    admin_headers: dict,
+    hashed_pass123: str,
+    auth_service: AuthService,
+):
+    """Test updating a user (and their password) through the API"""
+    user_service = UserService(db_session)
+    created_user = await user_service.create(UPDATE_USER, hashed_pass123)
 
     response = await client.put(
-        f"/api/v1/users/{created_user.id}", json={"name": "New Name"}
+        f"/api/v1/users/{created_user.id}",
+        json={"name": "New Name", "password": "newpassword"},
+        headers=admin_headers,
     )
     assert response.status_code == 200
     data = response.json()
     assert data["name"] == "New Name"
     assert data["email"] == "update@example.com"
 
-
-@pytest.mark.asyncio
-async def test_update_user_not_found(client: AsyncClient):
-    """Test updating a non-existent user"""
-    response = await client.put("/api/v1/users/999", json={"name": "New Name"})
-    assert response.status_code == 404
+    updated_user = await user_service.get_by_id(created_user.id)
+    assert await auth_service.verify_password(
+        "newpassword", updated_user.hashed_password
+    )
 
 
 @pytest.mark.asyncio
-async def test_delete_user(client: AsyncClient, db_session: AsyncSession):
+async def test_delete_user(db_session: AsyncSession, hashed_pass123: str):
     """Test deleting a user"""
     user_service = UserService(db_session)
-    auth_service = AuthService()
-    user = UserCreate(email="delete@example.com", name="Delete Me", password="pass123")
-    created_user = await user_service.create(
-        user, auth_service.get_password_hash(user.password)
-    )
+    created_user = await user_service.create(DELETE_USER, hashed_pass123)
 
-    response = await client.delete(f"/api/v1/users/{created_user.id}")
-    assert response.status_code == 204
+    assert await user_service.delete(created_user.id) is True
 
     # Verify user is deleted
-    response = await client.get(f"/api/v1/users/{created_user.id}")
-    assert response.status_code == 404
+    assert await user_service.get_by_id(created_user.id) is None
 
 
 @pytest.mark.asyncio
-async def test_delete_user_not_found(client: AsyncClient):
-    """Test deleting a non-existent user"""
-    response = await client.delete("/api/v1/users/999")
-    assert response.status_code == 404
+async def test_delete_user_endpoint(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    admin_headers: dict,
+    hashed_pass123: str,
+):
+    """Test deleting a user through the API"""
+    user_service = UserService(db_session)
+    created_user = await user_service.create(DELETE_USER, hashed_pass123)
+
+    response = await client.delete(
+        f"/api/v1/users/{created_user.id}", headers=admin_headers
+    )
+    assert response.status_code == 204
+    assert await user_service.get_by_id(created_user.id) is None
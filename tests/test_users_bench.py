@@ -0,0 +1,105 @@
+import asyncio
+import itertools
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.auth.service import AuthService
+from app.modules.user.schemas import UserCreate
+from app.modules.user.service import UserService
+
+# Benchmarks are disabled by default (each runs once, untimed); time them with
+# `poetry run task bench`
+ROUNDS = 50
+_PASSWORD = "pass123"
+_emails = (f"bench{i}@example.com" for i in itertools.count())
+
+
+@pytest_asyncio.fixture
+async def session_loop() -> asyncio.AbstractEventLoop:
+    """The session event loop, used to drive the client from sync benchmarks"""
+    return asyncio.get_running_loop()
+
+
+@pytest.fixture(scope="session")
+def hashed_password(auth_service: AuthService) -> str:
+    return auth_service.get_password_hash(_PASSWORD)
+
+
+@pytest_asyncio.fixture
+async def bench_user_id(db_session: AsyncSession, hashed_password: str) -> int:
+    user = UserCreate(email=next(_emails), name="Bench User", password=_PASSWORD)
+    created_user = await UserService(db_session).create(user, hashed_password)
+    return created_user.id
+
+
+def test_bench_create_user(benchmark, client: AsyncClient, session_loop):
+    """Benchmark POST /users/"""
+
+    def create():
+        body = {"email": next(_emails), "name": "Bench", "password": _PASSWORD}
+        return session_loop.run_until_complete(client.post("/api/v1/users/", json=body))
+
+    response = benchmark.pedantic(create, rounds=ROUNDS, iterations=1)
+    assert response.status_code == 201
+
+
+def test_bench_read_user(
+    benchmark, client: AsyncClient, session_loop, admin_headers, bench_user_id
+):
+    """Benchmark GET /users/{id}"""
+
+    def read():
+        return session_loop.run_until_complete(
+            client.get(f"/api/v1/users/{bench_user_id}", headers=admin_headers)
+        )
+
+    response = benchmark.pedantic(read, rounds=ROUNDS, iterations=1)
+    assert response.status_code == 200
+
+
+def test_bench_update_user(
+    benchmark, client: AsyncClient, session_loop, admin_headers, bench_user_id
+):
+    """Benchmark PUT /users/{id}"""
+
+    def update():
+        return session_loop.run_until_complete(
+            client.put(
+                f"/api/v1/users/{bench_user_id}",
+                json={"name": "Updated"},
+                headers=admin_headers,
+            )
+        )
+
+    response = benchmark.pedantic(update, rounds=ROUNDS, iterations=1)
+    assert response.status_code == 200
+
+
+def test_bench_delete_user(
+    benchmark,
+    client: AsyncClient,
+    db_session: AsyncSession,
+    session_loop,
+    admin_headers,
+    hashed_password: str,
+):
+    """Benchmark DELETE /users/{id} (a fresh user per round, created untimed)"""
+    user_service = UserService(db_session)
+
+    def setup():
+        user = UserCreate(email=next(_emails), name="Bench User", password=_PASSWORD)
+        created_user = session_loop.run_until_complete(
+            user_service.create(user, hashed_password)
+        )
+        return (created_user.id,), {}
+
+    def delete(user_id: int):
+        return session_loop.run_until_complete(
+            client.delete(f"/api/v1/users/{user_id}", headers=admin_headers)
+        )
+
+    response = benchmark.pedantic(delete, setup=setup, rounds=ROUNDS)
+    assert response.status_code == 204